@@ -6,12 +6,19 @@ AsterDex 永续合约 API 客户端
 
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Any
 from decimal import Decimal
 from dataclasses import dataclass
 from enum import Enum
 import httpx
 
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时回退 stdlib json
+    orjson = None
+
 from utils.signer import AsterDexSigner
 
 logger = logging.getLogger(__name__)
@@ -48,7 +55,7 @@ class TimeInForce(Enum):
     GTX = "GTX"  # Good Till Crossing (Post Only)
 
 
-@dataclass
+@dataclass(slots=True)
 class Balance:
     """账户余额"""
     asset: str
@@ -58,7 +65,7 @@ class Balance:
     cross_unrealized_pnl: Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """持仓信息"""
     symbol: str
@@ -72,7 +79,7 @@ class Position:
     isolated_margin: Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderResult:
     """下单结果"""
     success: bool
@@ -88,13 +95,102 @@ class OrderResult:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FundingRate:
-    """资金费率"""
+    """资金费率 (纯展示/比较用途，float 即可，避免 Decimal 解析开销)"""
     symbol: str
-    funding_rate: Decimal
+    funding_rate: float
     funding_time: int
-    mark_price: Decimal
+    mark_price: float
+
+
+class AsyncTokenBucket:
+    """自适应令牌桶限流器
+
+    发请求前先取令牌，突发请求在本地排队而不是打到服务端限流器上。
+    成功时缓慢提升速率，被限流 (429/418) 时清空令牌并将速率减半。
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        min_rate: float = 1.0,
+        max_rate: float = 50.0,
+    ):
+        self.rate = rate          # 令牌恢复速率 (个/秒)
+        self.burst = burst        # 桶容量 (允许的突发量)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取一个令牌，不足时等待恢复"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(float(self.burst), self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self):
+        """请求成功: 缓慢恢复速率"""
+        self.rate = min(self.max_rate, self.rate + 0.1)
+
+    def on_fail(self):
+        """被服务端限流: 清空令牌并将速率减半"""
+        self._tokens = 0.0
+        self.rate = max(self.min_rate, self.rate / 2)
+
+
+# 进程内共享的限流器 (所有客户端实例对同一 API 限流)
+_rate_limiter = AsyncTokenBucket()
+
+# 共享连接池: 同一 base_url 的多个客户端实例 (多账户) 共用一个 HTTP/2 连接池
+_POOLS: Dict[str, httpx.AsyncClient] = {}
+
+
+async def _pool_for(base_url: str, timeout: float) -> httpx.AsyncClient:
+    """获取 (或惰性创建) base_url 对应的共享 HTTP 客户端"""
+    pool = _POOLS.get(base_url)
+    if pool is None or pool.is_closed:
+        pool = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=20),
+            http2=True,
+        )
+        _POOLS[base_url] = pool
+    return pool
+
+
+def _D(x: Any) -> Decimal:
+    """JSON 数值转 Decimal (AsterDex 按 Binance 惯例返回 str，直接构造省掉一次 str())"""
+    if isinstance(x, str):
+        return Decimal(x)
+    return Decimal(str(x))
+
+
+def _json_loads(response: httpx.Response) -> Any:
+    """解析响应 JSON (优先 orjson，直接从 bytes 解析省掉 str 解码)"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头 (秒数格式)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
 
 
 class AsterDexError(Exception):
@@ -109,6 +205,9 @@ class AsterDexError(Exception):
 class AsterDexClient:
     """AsterDex 永续合约 API 客户端 - 支持 EVM 和 Solana 两种模式"""
 
+    # 行情缓存 TTL (秒): 调仓路径对 <1s 的行情陈旧度不敏感
+    PRICE_CACHE_TTL = 0.5
+
     def __init__(
         self,
         user_address: str,
@@ -142,9 +241,30 @@ class AsterDexClient:
         self.max_retries = max_retries
         self.chain = chain.lower()
 
+        # 行情结果 TTL 缓存 {key: (monotonic 时间戳, 结果)}
+        self._price_cache: Dict[str, tuple] = {}
+        self._price_locks: Dict[str, asyncio.Lock] = {}
+
+        # GET 去重: 相同查询的并发调用共享同一个在途请求
+        self._inflight: Dict[Any, asyncio.Future] = {}
+
         # 根据链类型选择 API 版本: Solana 用 v1, EVM 用 v3
         self.api_version = "v1" if self.chain == "solana" else "v3"
 
+        # 端点路径按实例固定，预先拼好避免热路径上反复格式化
+        prefix = f"/fapi/{self.api_version}"
+        self._ep = {
+            "ticker_price": f"{prefix}/ticker/price",
+            "premium_index": f"{prefix}/premiumIndex",
+            "depth": f"{prefix}/depth",
+            "balance": f"{prefix}/balance",
+            "account": f"{prefix}/account",
+            "position_risk": f"{prefix}/positionRisk",
+            "leverage": f"{prefix}/leverage",
+            "order": f"{prefix}/order",
+            "open_orders": f"{prefix}/openOrders",
+        }
+
         # 初始化签名器
         self.signer = AsterDexSigner(
             user_address=user_address,
@@ -155,8 +275,73 @@ class AsterDexClient:
             chain=chain,
         )
 
+        # 请求头按签名器固定，缓存一份; POST 头预先合并好 (form-urlencoded)
+        self._base_headers = self.signer.get_headers()
+        self._post_headers = {"Content-Type": "application/x-www-form-urlencoded", **self._base_headers}
+
+        # HTTP 方法分发表: 热路径上只做一次字典查找
+        self._dispatch = {
+            "GET": self._http_get,
+            "POST": self._http_post,
+            "DELETE": self._http_delete,
+        }
+
         logger.info(f"AsterDex 客户端初始化: base_url={base_url}, chain={chain}, api={self.api_version}, mode={self.signer.mode}")
 
+    async def _http_get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        client = await self._client()
+        return await client.get(path, params=params, headers=self._base_headers)
+
+    async def _http_post(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        # AsterDex 要求 POST 使用 form-urlencoded 格式
+        client = await self._client()
+        return await client.post(path, data=params, headers=self._post_headers)
+
+    async def _http_delete(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        client = await self._client()
+        return await client.delete(path, params=params, headers=self._base_headers)
+
+    async def _client(self) -> httpx.AsyncClient:
+        """获取 HTTP 客户端 (同 base_url 的实例共享连接池)"""
+        return await _pool_for(self.base_url, self.timeout)
+
+    async def close(self):
+        """关闭共享 HTTP 客户端 (之后再使用会惰性重建)"""
+        pool = _POOLS.pop(self.base_url, None)
+        if pool and not pool.is_closed:
+            await pool.aclose()
+
+    async def __aenter__(self) -> "AsterDexClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _cached_fetch(self, key: str, ttl: Optional[float], fetch) -> Any:
+        """带 TTL 的行情缓存
+
+        同一 key 的并发调用共享一次请求 (single-flight)；ttl=0 强制刷新。
+        """
+        if ttl is None:
+            ttl = self.PRICE_CACHE_TTL
+
+        if ttl > 0:
+            hit = self._price_cache.get(key)
+            if hit and time.monotonic() - hit[0] < ttl:
+                return hit[1]
+
+        lock = self._price_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # 等锁期间可能已有别的调用者填好缓存
+            if ttl > 0:
+                hit = self._price_cache.get(key)
+                if hit and time.monotonic() - hit[0] < ttl:
+                    return hit[1]
+
+            value = await fetch()
+            self._price_cache[key] = (time.monotonic(), value)
+            return value
+
     async def _request(
         self,
         method: str,
@@ -176,46 +361,81 @@ class AsterDexClient:
         Returns:
             API 响应数据
         """
-        url = f"{self.base_url}{endpoint}"
+        # GET 去重 (single-flight): 重叠的相同查询共享一个在途请求，
+        # 既省 HTTP 往返也省 AsterDex 限频额度
+        if method == "GET":
+            key = (endpoint, tuple(sorted((params or {}).items())))
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return await asyncio.shield(existing)
+
+            future: asyncio.Future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                result = await self._do_request(method, endpoint, params, signed)
+            except BaseException as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+                    future.exception()  # 无等待者时避免 "exception never retrieved"
+                raise
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+                return result
+            finally:
+                self._inflight.pop(key, None)
+
+        return await self._do_request(method, endpoint, params, signed)
+
+    async def _do_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        signed: bool = True,
+    ) -> Dict[str, Any]:
+        """实际发送 HTTP 请求 (含限流与重试)"""
         params = params or {}
 
         # 签名
         if signed:
             params = self.signer.sign_simple(params)
 
-        # 获取签名器提供的请求头 (HMAC 模式需要 X-MBX-APIKEY)
-        base_headers = self.signer.get_headers()
-
         last_error: Optional[Exception] = None
 
         for attempt in range(1, self.max_retries + 1):
+            retry_after: Optional[float] = None  # 服务端指定的等待时间
+
+            # 本地限流: 先取令牌再发请求，避免突发打爆服务端限流器
+            await _rate_limiter.acquire()
+
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    if method == "GET":
-                        response = await client.get(url, params=params, headers=base_headers)
-                    elif method == "POST":
-                        # AsterDex 要求 POST 使用 form-urlencoded 格式
-                        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-                        headers.update(base_headers)
-                        response = await client.post(url, data=params, headers=headers)
-                    elif method == "DELETE":
-                        response = await client.delete(url, params=params, headers=base_headers)
-                    else:
-                        raise ValueError(f"不支持的 HTTP 方法: {method}")
-
-                    # 检查响应状态
-                    if response.status_code == 429:
-                        raise AsterDexError("请求频率超限", code=429)
-                    elif response.status_code == 418:
-                        raise AsterDexError("IP 被临时封禁", code=418)
-                    elif response.status_code >= 400:
-                        error_data = response.json() if response.text else {}
-                        raise AsterDexError(
-                            error_data.get("msg", f"HTTP {response.status_code}"),
-                            code=error_data.get("code", response.status_code)
-                        )
-
-                    data = response.json()
+                sender = self._dispatch.get(method)
+                if sender is None:
+                    raise ValueError(f"不支持的 HTTP 方法: {method}")
+                response = await sender(endpoint, params)
+
+                # 检查响应状态
+                if response.status_code in (429, 418):
+                    # 被限流/封禁: 收缩令牌桶，按 Retry-After 等待后重试
+                    _rate_limiter.on_fail()
+                    message = "请求频率超限" if response.status_code == 429 else "IP 被临时封禁"
+                    last_error = AsterDexError(message, code=response.status_code)
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    logger.warning(f"{message} (尝试 {attempt}/{self.max_retries}, Retry-After={retry_after})")
+                elif response.status_code >= 400:
+                    # 错误体只解码一次 (bytes)，非 JSON 响应降级为空 dict
+                    try:
+                        error_data = _json_loads(response) if response.content else {}
+                    except ValueError:
+                        error_data = {}
+                    raise AsterDexError(
+                        error_data.get("msg", f"HTTP {response.status_code}"),
+                        code=error_data.get("code", response.status_code)
+                    )
+                else:
+                    data = _json_loads(response)
+                    _rate_limiter.on_success()
                     logger.debug(f"API 响应: {endpoint} -> {data}")
                     return data
 
@@ -234,71 +454,80 @@ class AsterDexClient:
                 last_error = AsterDexError(f"未知错误: {e}")
                 logger.error(f"未知错误 (尝试 {attempt}/{self.max_retries}): {e}")
 
-            # 重试等待
+            # 重试等待: 优先使用服务端 Retry-After，否则指数退避 + 抖动
             if attempt < self.max_retries:
-                wait_time = 2 ** (attempt - 1)
+                if retry_after is not None:
+                    wait_time = retry_after
+                else:
+                    wait_time = min(30.0, 2 ** (attempt - 1)) * (1 + random.random() * 0.5)
                 await asyncio.sleep(wait_time)
 
         raise last_error or AsterDexError("请求失败")
 
     # ==================== 行情接口 (无需签名) ====================
 
-    async def get_ticker_price(self, symbol: str) -> Dict[str, Any]:
+    async def get_ticker_price(self, symbol: str, ttl: Optional[float] = None) -> Dict[str, Any]:
         """
-        获取最新价格
+        获取最新价格 (短 TTL 缓存)
 
         Args:
             symbol: 交易对 (如 SOLUSDT)
+            ttl: 缓存时长 (秒)，默认 PRICE_CACHE_TTL，传 0 强制刷新
 
         Returns:
             价格数据
         """
-        return await self._request(
-            "GET",
-            f"/fapi/{self.api_version}/ticker/price",
-            {"symbol": symbol},
-            signed=False
+        return await self._cached_fetch(
+            f"ticker:{symbol}",
+            ttl,
+            lambda: self._request(
+                "GET",
+                self._ep["ticker_price"],
+                {"symbol": symbol},
+                signed=False
+            ),
         )
 
-    async def get_mark_price(self, symbol: str) -> Dict[str, Any]:
+    async def get_mark_price(self, symbol: str, ttl: Optional[float] = None) -> Dict[str, Any]:
         """
-        获取标记价格
+        获取标记价格 (短 TTL 缓存)
 
         Args:
             symbol: 交易对
+            ttl: 缓存时长 (秒)，默认 PRICE_CACHE_TTL，传 0 强制刷新
 
         Returns:
             标记价格数据
         """
-        return await self._request(
-            "GET",
-            f"/fapi/{self.api_version}/premiumIndex",
-            {"symbol": symbol},
-            signed=False
+        return await self._cached_fetch(
+            f"premium:{symbol}",
+            ttl,
+            lambda: self._request(
+                "GET",
+                self._ep["premium_index"],
+                {"symbol": symbol},
+                signed=False
+            ),
         )
 
-    async def get_funding_rate(self, symbol: str) -> FundingRate:
+    async def get_funding_rate(self, symbol: str, ttl: Optional[float] = None) -> FundingRate:
         """
-        获取资金费率
+        获取资金费率 (短 TTL 缓存，与标记价格共享 premiumIndex 结果)
 
         Args:
             symbol: 交易对
+            ttl: 缓存时长 (秒)，默认 PRICE_CACHE_TTL，传 0 强制刷新
 
         Returns:
             FundingRate: 资金费率信息
         """
-        data = await self._request(
-            "GET",
-            f"/fapi/{self.api_version}/premiumIndex",
-            {"symbol": symbol},
-            signed=False
-        )
+        data = await self.get_mark_price(symbol, ttl=ttl)
 
         return FundingRate(
             symbol=data.get("symbol", symbol),
-            funding_rate=Decimal(str(data.get("lastFundingRate", "0"))),
+            funding_rate=float(data.get("lastFundingRate") or 0),
             funding_time=int(data.get("nextFundingTime", 0)),
-            mark_price=Decimal(str(data.get("markPrice", "0")))
+            mark_price=float(data.get("markPrice") or 0)
         )
 
     async def get_depth(self, symbol: str, limit: int = 20) -> Dict[str, Any]:
@@ -314,7 +543,7 @@ class AsterDexClient:
         """
         return await self._request(
             "GET",
-            f"/fapi/{self.api_version}/depth",
+            self._ep["depth"],
             {"symbol": symbol, "limit": limit},
             signed=False
         )
@@ -328,16 +557,16 @@ class AsterDexClient:
         Returns:
             List[Balance]: 余额列表
         """
-        data = await self._request("GET", f"/fapi/{self.api_version}/balance", {})
+        data = await self._request("GET", self._ep["balance"], {})
 
         balances = []
         for item in data:
             # v1 和 v3 API 返回字段名不同
-            balance = Decimal(str(item.get("balance", "0")))
+            balance = _D(item.get("balance") or "0")
             # v1: withdrawAvailable, v3: availableBalance
-            available = Decimal(str(item.get("availableBalance") or item.get("withdrawAvailable", "0")))
-            cross_wallet = Decimal(str(item.get("crossWalletBalance", "0")))
-            cross_pnl = Decimal(str(item.get("crossUnPnl", "0")))
+            available = _D(item.get("availableBalance") or item.get("withdrawAvailable") or "0")
+            cross_wallet = _D(item.get("crossWalletBalance") or "0")
+            cross_pnl = _D(item.get("crossUnPnl") or "0")
 
             balances.append(Balance(
                 asset=item["asset"],
@@ -356,43 +585,56 @@ class AsterDexClient:
         Returns:
             账户详情
         """
-        return await self._request("GET", f"/fapi/{self.api_version}/account", {})
+        return await self._request("GET", self._ep["account"], {})
 
-    async def get_positions(self, symbol: Optional[str] = None) -> List[Position]:
+    async def iter_positions(self, symbol: Optional[str] = None):
         """
-        获取持仓信息
+        流式遍历非空持仓
+
+        空仓位行只做一次廉价的 float 过滤就丢弃，解析成本随保留行数
+        而不是总行数增长；逐行惰性产出 Position。
 
         Args:
-            symbol: 交易对 (可选，不传则返回所有持仓)
+            symbol: 交易对 (可选，不传则遍历所有持仓)
 
-        Returns:
-            List[Position]: 持仓列表
+        Yields:
+            Position: 非空持仓
         """
         params = {}
         if symbol:
             params["symbol"] = symbol
 
-        data = await self._request("GET", f"/fapi/{self.api_version}/positionRisk", params)
+        data = await self._request("GET", self._ep["position_risk"], params)
 
-        positions = []
         for item in data:
-            qty = Decimal(str(item.get("positionAmt", "0")))
-            if qty == 0:
+            raw_qty = item.get("positionAmt") or "0"
+            # 先用廉价的 float 比较过滤空仓位，只对真实持仓构建 Decimal
+            if float(raw_qty) == 0.0:
                 continue  # 跳过空仓位
 
-            positions.append(Position(
+            yield Position(
                 symbol=item["symbol"],
                 position_side=item.get("positionSide", "BOTH"),
-                quantity=qty,
-                entry_price=Decimal(str(item.get("entryPrice", "0"))),
-                mark_price=Decimal(str(item.get("markPrice", "0"))),
-                unrealized_pnl=Decimal(str(item.get("unRealizedProfit", "0"))),
+                quantity=_D(raw_qty),
+                entry_price=_D(item.get("entryPrice") or "0"),
+                mark_price=_D(item.get("markPrice") or "0"),
+                unrealized_pnl=_D(item.get("unRealizedProfit") or "0"),
                 leverage=int(item.get("leverage", 1)),
                 margin_type=item.get("marginType", "cross"),
-                isolated_margin=Decimal(str(item.get("isolatedMargin", "0")))
-            ))
+                isolated_margin=_D(item.get("isolatedMargin") or "0")
+            )
+
+    async def get_positions(self, symbol: Optional[str] = None) -> List[Position]:
+        """
+        获取持仓信息
+
+        Args:
+            symbol: 交易对 (可选，不传则返回所有持仓)
 
-        return positions
+        Returns:
+            List[Position]: 持仓列表
+        """
+        return [pos async for pos in self.iter_positions(symbol)]
 
     # ==================== 交易接口 ====================
 
@@ -409,7 +651,7 @@ class AsterDexClient:
         """
         return await self._request(
             "POST",
-            f"/fapi/{self.api_version}/leverage",
+            self._ep["leverage"],
             {"symbol": symbol, "leverage": leverage}
         )
 
@@ -466,12 +708,16 @@ class AsterDexClient:
         if client_order_id:
             params["newClientOrderId"] = client_order_id
 
+        return await self._submit_order(params, order_type)
+
+    async def _submit_order(self, params: Dict[str, Any], order_type: OrderType) -> OrderResult:
+        """提交订单参数并解析为 OrderResult"""
         try:
-            data = await self._request("POST", f"/fapi/{self.api_version}/order", params)
+            data = await self._request("POST", self._ep["order"], params)
 
             # 解析成交数量 (市价单可能立即成交)
-            orig_qty = Decimal(str(data.get("origQty", "0")))
-            exec_qty = Decimal(str(data.get("executedQty", "0")))
+            orig_qty = _D(data.get("origQty") or "0")
+            exec_qty = _D(data.get("executedQty") or "0")
 
             # 对于市价单，如果 executedQty 为 0，可能还没返回成交信息，用 origQty 作为预估
             if order_type == OrderType.MARKET and exec_qty == 0:
@@ -487,7 +733,7 @@ class AsterDexClient:
                 side=data.get("side"),
                 type=data.get("type"),
                 quantity=orig_qty,
-                price=Decimal(str(data.get("price", "0"))),
+                price=_D(data.get("price") or "0"),
                 filled_quantity=exec_qty,
                 status=data.get("status"),
             )
@@ -523,7 +769,7 @@ class AsterDexClient:
             raise ValueError("必须指定 order_id 或 client_order_id")
 
         try:
-            await self._request("DELETE", f"/fapi/{self.api_version}/order", params)
+            await self._request("DELETE", self._ep["order"], params)
             return True
         except AsterDexError as e:
             logger.error(f"撤单失败: {e.message}")
@@ -555,7 +801,7 @@ class AsterDexClient:
         else:
             raise ValueError("必须指定 order_id 或 client_order_id")
 
-        return await self._request("GET", f"/fapi/{self.api_version}/order", params)
+        return await self._request("GET", self._ep["order"], params)
 
     async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -571,7 +817,7 @@ class AsterDexClient:
         if symbol:
             params["symbol"] = symbol
 
-        return await self._request("GET", f"/fapi/{self.api_version}/openOrders", params)
+        return await self._request("GET", self._ep["open_orders"], params)
 
     # ==================== 便捷方法 ====================
 
@@ -630,3 +876,41 @@ class AsterDexClient:
             position_side=position_side,
             reduce_only=reduce_only,
         )
+
+    def make_market_sender(
+        self,
+        symbol: str,
+        side: OrderSide,
+        position_side: PositionSide = PositionSide.BOTH,
+    ) -> Callable[..., Awaitable[OrderResult]]:
+        """
+        为固定 (交易对, 方向) 预构建市价下单函数
+
+        调仓热路径对同一交易对反复下单，基础参数 (symbol/side/type/
+        positionSide) 不变，预构建后每次下单只需填数量。
+
+        Args:
+            symbol: 交易对
+            side: 买卖方向
+            position_side: 持仓方向
+
+        Returns:
+            async send(quantity, reduce_only=False) -> OrderResult
+        """
+        base_params = {
+            "symbol": symbol,
+            "side": side.value,
+            "type": OrderType.MARKET.value,
+        }
+        # v3 API 支持 positionSide，v1 不支持
+        if self.api_version == "v3":
+            base_params["positionSide"] = position_side.value
+
+        async def send(quantity: Decimal, reduce_only: bool = False) -> OrderResult:
+            params = dict(base_params)
+            params["quantity"] = str(quantity)
+            if reduce_only:
+                params["reduceOnly"] = "true"
+            return await self._submit_order(params, OrderType.MARKET)
+
+        return send
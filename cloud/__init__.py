@@ -11,6 +11,7 @@ from cloud.client import CloudClient, CloudConfig
 from cloud.license_manager import LicenseManager
 from cloud.data_reporter import DataReporter
 from cloud.config_sync import ConfigSync
+from cloud.scheduler import CloudScheduler
 
 __all__ = [
     "CloudClient",
@@ -18,4 +19,5 @@ __all__ = [
     "LicenseManager",
     "DataReporter",
     "ConfigSync",
+    "CloudScheduler",
 ]
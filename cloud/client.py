@@ -5,11 +5,24 @@
 """
 
 import os
+import gzip
+import json
 import hashlib
 import platform
 import uuid
+import asyncio
 import logging
+import functools
 import httpx
+
+try:
+    import orjson
+    # naive datetime 按 UTC 序列化，numpy 标量直接编码
+    _ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:  # 可选依赖，未安装时回退 stdlib json
+    orjson = None
+    _ORJSON_OPTS = 0
+
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
@@ -22,6 +35,7 @@ class CloudConfig:
     """云端配置"""
     enabled: bool = True
     api_url: str = "https://jlp.finance"  # SaaS 平台 URL
+    api_url_fallback: str = ""  # 备用 URL（License 验证对冲请求，可选）
     license_key: str = ""
     report_interval: int = 300  # 上报间隔（秒）
     timeout: float = 30.0
@@ -32,105 +46,162 @@ class CloudConfig:
         return cls(
             enabled=os.getenv("CLOUD_ENABLED", "true").lower() == "true",
             api_url=os.getenv("CLOUD_API_URL", "https://jlp.finance"),
+            api_url_fallback=os.getenv("CLOUD_API_URL_FALLBACK", ""),
             license_key=os.getenv("LICENSE_KEY", ""),
             report_interval=int(os.getenv("REPORT_INTERVAL", "300")),
             timeout=float(os.getenv("CLOUD_TIMEOUT", "30.0")),
         )
 
 
+@functools.cache
+def _compute_device_id() -> str:
+    """
+    生成设备唯一标识 (进程内只计算一次)
+
+    优先级:
+    1. 环境变量 DEVICE_ID（推荐 Docker 使用）
+    2. 持久化文件 /app/data/.device_id
+    3. 基于机器信息生成
+    """
+    # 1. 环境变量
+    env_device_id = os.environ.get("DEVICE_ID")
+    if env_device_id:
+        return env_device_id
+
+    # 2. 持久化文件（Docker 挂载的 data 目录）
+    device_id_file = Path("/app/data/.device_id")
+    if not device_id_file.exists():
+        # 尝试本地开发路径
+        device_id_file = Path(__file__).parent.parent / "data" / ".device_id"
+
+    if device_id_file.exists():
+        try:
+            return device_id_file.read_text().strip()
+        except Exception:
+            pass
+
+    # 3. 生成新的 device_id 并保存
+    machine_info = f"{platform.node()}-{platform.machine()}-{uuid.getnode()}-{os.getpid()}"
+    # blake2b 直接输出 16 字节 (32 hex)，比 sha256 截断更快且宽度精确
+    device_id = hashlib.blake2b(machine_info.encode(), digest_size=16).hexdigest()
+
+    # 尝试保存到文件（确保重启后一致）
+    try:
+        device_id_file.parent.mkdir(parents=True, exist_ok=True)
+        device_id_file.write_text(device_id)
+    except Exception:
+        pass  # 保存失败不影响运行
+
+    return device_id
+
+
 class CloudClient:
     """云端 API 客户端"""
     
-    def __init__(self, config: CloudConfig, account_name: str = "default"):
+    def __init__(
+        self,
+        config: CloudConfig,
+        account_name: str = "default",
+        session: Optional[httpx.AsyncClient] = None,
+    ):
         self.config = config
         self.account_name = account_name  # 账户名（用于服务端限制）
-        self.device_id = self._get_device_id()
+        self.device_id = _compute_device_id()
         self.device_name = platform.node()
-        self._http_client: Optional[httpx.AsyncClient] = None
+        # 外部注入的共享连接池: 多账户客户端复用同一组 keep-alive 连接
+        self._http_client: Optional[httpx.AsyncClient] = session
+        self._owns_client = session is None
+
+        # 预构建上报信封 (type/account_name 不变，每次只替换 data)
+        self._report_envelopes: Dict[str, Dict[str, Any]] = {
+            report_type: {"type": report_type, "data": None, "account_name": account_name}
+            for report_type in ("equity", "rebalance", "alert")
+        }
     
     def set_account_name(self, name: str):
         """设置当前账户名"""
         self.account_name = name
+        for envelope in self._report_envelopes.values():
+            envelope["account_name"] = name
     
-    def _get_device_id(self) -> str:
-        """
-        生成设备唯一标识
-        
-        优先级:
-        1. 环境变量 DEVICE_ID（推荐 Docker 使用）
-        2. 持久化文件 /app/data/.device_id
-        3. 基于机器信息生成
-        """
-        # 1. 环境变量
-        env_device_id = os.environ.get("DEVICE_ID")
-        if env_device_id:
-            return env_device_id
-        
-        # 2. 持久化文件（Docker 挂载的 data 目录）
-        device_id_file = Path("/app/data/.device_id")
-        if not device_id_file.exists():
-            # 尝试本地开发路径
-            device_id_file = Path(__file__).parent.parent / "data" / ".device_id"
-        
-        if device_id_file.exists():
-            try:
-                return device_id_file.read_text().strip()
-            except Exception:
-                pass
-        
-        # 3. 生成新的 device_id 并保存
-        machine_info = f"{platform.node()}-{platform.machine()}-{uuid.getnode()}-{os.getpid()}"
-        device_id = hashlib.sha256(machine_info.encode()).hexdigest()[:32]
-        
-        # 尝试保存到文件（确保重启后一致）
-        try:
-            device_id_file.parent.mkdir(parents=True, exist_ok=True)
-            device_id_file.write_text(device_id)
-        except Exception:
-            pass  # 保存失败不影响运行
-        
-        return device_id
+    @staticmethod
+    def build_session(config: CloudConfig) -> httpx.AsyncClient:
+        """构建连接池客户端 (可在多个 CloudClient 间共享)"""
+        return httpx.AsyncClient(
+            timeout=config.timeout,
+            proxy=None,  # 禁用代理
+            http2=True,  # 多路复用，多个并发上报共享一条 TLS 连接
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=128,
+                keepalive_expiry=60.0,
+            ),
+            headers={
+                "Content-Type": "application/json",
+                "X-License-Key": config.license_key,
+                "User-Agent": "JLP-Hedge-Trading/1.0",
+            }
+        )
     
     async def _get_client(self) -> httpx.AsyncClient:
         """获取 HTTP 客户端"""
         if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(
-                timeout=self.config.timeout,
-                proxy=None,  # 禁用代理
-                headers={
-                    "Content-Type": "application/json",
-                    "X-License-Key": self.config.license_key,
-                    "User-Agent": "JLP-Hedge-Trading/1.0",
-                }
-            )
+            self._http_client = self.build_session(self.config)
+            self._owns_client = True
         return self._http_client
     
+    @staticmethod
+    def _dump_json(payload: Dict[str, Any]) -> bytes:
+        """序列化 payload (优先 orjson，datetime 直接交给编码器处理)"""
+        if orjson is not None:
+            return orjson.dumps(payload, option=_ORJSON_OPTS)
+        return json.dumps(payload, default=str).encode("utf-8")
+
+    async def _post_json(self, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST JSON 数据 (优先 orjson 序列化，bytes 直出)"""
+        client = await self._get_client()
+        return await client.post(url, content=self._dump_json(payload))
+
+    # 超过该字节数的报文压缩移交线程池，避免阻塞事件循环
+    _GZIP_EXECUTOR_THRESHOLD = 32 * 1024
+
+    async def _post_gzip_json(self, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST gzip 压缩的 JSON (大报文省带宽，level-1 压缩开销可忽略)"""
+        client = await self._get_client()
+        data = self._dump_json(payload)
+        if len(data) >= self._GZIP_EXECUTOR_THRESHOLD:
+            # gzip 压缩释放 GIL，大报文放线程池保持循环响应
+            body = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(gzip.compress, data, compresslevel=1)
+            )
+        else:
+            body = gzip.compress(data, compresslevel=1)
+        return await client.post(url, content=body, headers={"Content-Encoding": "gzip"})
+
+    @staticmethod
+    def _parse_json(resp: httpx.Response) -> Dict[str, Any]:
+        """解析响应 JSON (优先 orjson)"""
+        if orjson is not None:
+            return orjson.loads(resp.content)
+        return resp.json()
+
     async def close(self):
-        """关闭客户端"""
-        if self._http_client and not self._http_client.is_closed:
+        """关闭客户端 (共享连接池由其所有者负责关闭)"""
+        if self._owns_client and self._http_client and not self._http_client.is_closed:
             await self._http_client.aclose()
-            self._http_client = None
+        self._http_client = None
     
     # ========== License 相关 API ==========
     
-    async def verify_license(self) -> Dict[str, Any]:
-        """
-        验证 License
-        
-        Returns:
-            验证结果: {
-                "valid": bool,
-                "user_id": str,
-                "plan_type": str,
-                "expires_at": str | None,
-                "config": dict,  # 策略配置
-            }
-        """
+    # 对冲请求延迟: 主端点超过该时长未响应时向备用端点并发同一请求
+    HEDGE_DELAY = 0.15
+
+    async def _verify_license_at(self, api_url: str) -> Dict[str, Any]:
+        """向指定端点发起一次 License 验证"""
         try:
-            client = await self._get_client()
-            resp = await client.post(
-                f"{self.config.api_url}/api/hedge/verify",
-                json={
+            resp = await self._post_json(
+                f"{api_url}/api/hedge/verify",
+                {
                     "license_key": self.config.license_key,
                     "device_id": self.device_id,
                     "device_name": self.device_name,
@@ -138,7 +209,7 @@ class CloudClient:
             )
             
             if resp.status_code == 200:
-                return resp.json()
+                return self._parse_json(resp)
             else:
                 logger.error(f"License 验证失败: HTTP {resp.status_code}")
                 return {"valid": False, "error": f"HTTP {resp.status_code}"}
@@ -146,10 +217,47 @@ class CloudClient:
         except Exception as e:
             logger.error(f"License 验证异常: {e}")
             return {"valid": False, "error": str(e)}
+
+    async def verify_license(self) -> Dict[str, Any]:
+        """
+        验证 License (配置了备用端点时做请求对冲，取先返回者)
+        
+        Returns:
+            验证结果: {
+                "valid": bool,
+                "user_id": str,
+                "plan_type": str,
+                "expires_at": str | None,
+                "config": dict,  # 策略配置
+            }
+        """
+        fallback = self.config.api_url_fallback
+        if not fallback or fallback == self.config.api_url:
+            return await self._verify_license_at(self.config.api_url)
+        
+        # 对冲: 主端点先行，HEDGE_DELAY 内未完成则并发备用端点，取先完成的有效结果
+        primary = asyncio.create_task(self._verify_license_at(self.config.api_url))
+        done, _ = await asyncio.wait({primary}, timeout=self.HEDGE_DELAY)
+        if done:
+            return primary.result()
+        
+        pending = {primary, asyncio.create_task(self._verify_license_at(fallback))}
+        result: Dict[str, Any] = {"valid": False, "error": "no response"}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                # 明确的验证结论（成功或服务端拒绝）即可取消落后请求
+                if "error" not in result:
+                    for loser in pending:
+                        loser.cancel()
+                    return result
+        # 两个端点都异常时返回最后一个错误
+        return result
     
     # ========== 数据上报 API ==========
     
-    async def report_equity(self, data: Dict[str, Any]) -> bool:
+    async def report_equity(self, data: Dict[str, Any], account_name: Optional[str] = None) -> bool:
         """
         上报净值数据
         
@@ -166,22 +274,17 @@ class CloudClient:
             }
         """
         try:
-            client = await self._get_client()
-            resp = await client.post(
-                f"{self.config.api_url}/api/hedge/report",
-                json={
-                    "type": "equity",
-                    "data": data,
-                    "account_name": self.account_name,  # 服务端账户限制
-                }
-            )
+            envelope = self._report_envelopes["equity"]
+            envelope["data"] = data
+            envelope["account_name"] = account_name or self.account_name
+            resp = await self._post_json(f"{self.config.api_url}/api/hedge/report", envelope)
             
             if resp.status_code == 200:
                 logger.debug("净值数据上报成功")
                 return True
             elif resp.status_code == 403:
                 # 账户数量限制
-                result = resp.json()
+                result = self._parse_json(resp)
                 if result.get("error_code") == "ACCOUNT_LIMIT_EXCEEDED":
                     logger.error(f"账户数量超限: {result.get('error')}")
                     logger.error("请升级到终身版以支持多账户")
@@ -194,7 +297,7 @@ class CloudClient:
             logger.error(f"净值数据上报异常: {e}")
             return False
     
-    async def report_rebalance(self, data: Dict[str, Any]) -> bool:
+    async def report_rebalance(self, data: Dict[str, Any], account_name: Optional[str] = None) -> bool:
         """
         上报调仓记录
         
@@ -211,15 +314,10 @@ class CloudClient:
             }
         """
         try:
-            client = await self._get_client()
-            resp = await client.post(
-                f"{self.config.api_url}/api/hedge/report",
-                json={
-                    "type": "rebalance",
-                    "data": data,
-                    "account_name": self.account_name,
-                }
-            )
+            envelope = self._report_envelopes["rebalance"]
+            envelope["data"] = data
+            envelope["account_name"] = account_name or self.account_name
+            resp = await self._post_json(f"{self.config.api_url}/api/hedge/report", envelope)
             
             if resp.status_code == 200:
                 logger.debug(f"调仓记录上报成功: {data.get('symbol')}")
@@ -235,7 +333,7 @@ class CloudClient:
             logger.error(f"调仓记录上报异常: {e}")
             return False
     
-    async def report_alert(self, data: Dict[str, Any]) -> bool:
+    async def report_alert(self, data: Dict[str, Any], account_name: Optional[str] = None) -> bool:
         """
         上报告警信息
         
@@ -248,15 +346,10 @@ class CloudClient:
             }
         """
         try:
-            client = await self._get_client()
-            resp = await client.post(
-                f"{self.config.api_url}/api/hedge/report",
-                json={
-                    "type": "alert",
-                    "data": data,
-                    "account_name": self.account_name,
-                }
-            )
+            envelope = self._report_envelopes["alert"]
+            envelope["data"] = data
+            envelope["account_name"] = account_name or self.account_name
+            resp = await self._post_json(f"{self.config.api_url}/api/hedge/report", envelope)
             
             if resp.status_code == 200:
                 logger.debug(f"告警上报成功: {data.get('title')}")
@@ -272,9 +365,69 @@ class CloudClient:
             logger.error(f"告警上报异常: {e}")
             return False
     
-    async def report_orders(self, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def report_alerts(self, alerts: List[Dict[str, Any]], account_name: Optional[str] = None) -> bool:
         """
-        批量上报订单信息
+        批量上报告警 (整队列单次 POST，替代逐条上报)
+        
+        Args:
+            alerts: 告警列表，元素结构同 report_alert
+        """
+        if not alerts:
+            return True
+        
+        try:
+            envelope = self._report_envelopes["alert"]
+            envelope["data"] = alerts
+            envelope["account_name"] = account_name or self.account_name
+            resp = await self._post_json(f"{self.config.api_url}/api/hedge/report", envelope)
+            
+            if resp.status_code == 200:
+                logger.debug(f"告警批量上报成功: {len(alerts)} 条")
+                return True
+            elif resp.status_code == 403:
+                logger.error("账户数量超限，告警上报被拒绝")
+                return False
+            else:
+                logger.warning(f"告警批量上报失败: HTTP {resp.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"告警批量上报异常: {e}")
+            return False
+    
+    async def report_rebalances(self, rebalances: List[Dict[str, Any]], account_name: Optional[str] = None) -> bool:
+        """
+        批量上报调仓记录 (整队列单次 POST，替代逐条上报)
+        
+        Args:
+            rebalances: 调仓记录列表，元素结构同 report_rebalance
+        """
+        if not rebalances:
+            return True
+        
+        try:
+            envelope = self._report_envelopes["rebalance"]
+            envelope["data"] = rebalances
+            envelope["account_name"] = account_name or self.account_name
+            resp = await self._post_json(f"{self.config.api_url}/api/hedge/report", envelope)
+            
+            if resp.status_code == 200:
+                logger.debug(f"调仓记录批量上报成功: {len(rebalances)} 条")
+                return True
+            elif resp.status_code == 403:
+                logger.error("账户数量超限，调仓记录上报被拒绝")
+                return False
+            else:
+                logger.warning(f"调仓记录批量上报失败: HTTP {resp.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"调仓记录批量上报异常: {e}")
+            return False
+    
+    async def report_orders(self, orders: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
+        """
+        批量上报订单信息 (分批 gzip 压缩并发上传)
         
         Args:
             orders: 订单列表，每个订单包含:
@@ -300,37 +453,110 @@ class CloudClient:
         Returns:
             {"success": bool, "data": {"received": int, "saved": int}}
         """
+        if not orders:
+            return {"success": True, "data": {"received": 0, "saved": 0}}
+
+        url = f"{self.config.api_url}/api/executor/report-order"
+        batches = [orders[i:i + batch_size] for i in range(0, len(orders), batch_size)]
+        semaphore = asyncio.Semaphore(4)  # 并发上限，批次在 HTTP/2 连接上多路复用
+
+        async def send_batch(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    resp = await self._post_gzip_json(url, {"orders": batch})
+
+                    if resp.status_code == 200:
+                        return self._parse_json(resp)
+                    else:
+                        logger.warning(f"订单上报失败: HTTP {resp.status_code}")
+                        return {"success": False, "error": f"HTTP {resp.status_code}"}
+
+                except Exception as e:
+                    logger.error(f"订单上报异常: {e}")
+                    return {"success": False, "error": str(e)}
+
+        results = await asyncio.gather(*(send_batch(batch) for batch in batches))
+
+        received = sum(r.get("data", {}).get("received", 0) for r in results if r.get("success"))
+        saved = sum(r.get("data", {}).get("saved", 0) for r in results if r.get("success"))
+
+        if all(r.get("success") for r in results):
+            logger.debug(f"订单上报成功: {saved} 条")
+            return {"success": True, "data": {"received": received, "saved": saved}}
+
+        errors = [str(r.get("error", "")) for r in results if not r.get("success")]
+        return {"success": False, "error": "; ".join(e for e in errors if e)}
+    
+    async def report_bulk(self, payload: Dict[str, Any], account_name: Optional[str] = None) -> bool:
+        """
+        聚合上报 (equity/orders/alerts/rebalances 合并为单次 POST)
+        
+        Args:
+            payload: 仅包含非空分节，如:
+                {
+                    "equity": {...},
+                    "orders": [...],
+                    "alerts": [...],
+                    "rebalances": [...],
+                }
+        """
+        if not payload:
+            return True
+        
         try:
-            client = await self._get_client()
-            resp = await client.post(
-                f"{self.config.api_url}/api/executor/report-order",
-                json={"orders": orders}
+            body = {"account_name": account_name or self.account_name, **payload}
+            resp = await self._post_gzip_json(f"{self.config.api_url}/api/hedge/report/bulk", body)
+            
+            if resp.status_code == 200:
+                logger.debug(f"聚合上报成功: {', '.join(payload.keys())}")
+                return True
+            elif resp.status_code == 403:
+                logger.error("账户数量超限，聚合上报被拒绝")
+                return False
+            else:
+                logger.warning(f"聚合上报失败: HTTP {resp.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"聚合上报异常: {e}")
+            return False
+
+    async def report_batch(self, accounts: List[Dict[str, Any]]) -> bool:
+        """
+        多账户批量上报 (所有账户的聚合分节合并为单次 POST)
+        
+        Args:
+            accounts: 每项为带 account_name 的聚合 payload 列表
+        """
+        if not accounts:
+            return True
+        
+        try:
+            resp = await self._post_gzip_json(
+                f"{self.config.api_url}/api/hedge/report/batch", {"accounts": accounts}
             )
             
             if resp.status_code == 200:
-                result = resp.json()
-                logger.debug(f"订单上报成功: {result.get('data', {}).get('saved', 0)} 条")
-                return result
+                logger.debug(f"批量上报成功: {len(accounts)} 个账户")
+                return True
+            elif resp.status_code == 403:
+                logger.error("账户数量超限，批量上报被拒绝")
+                return False
             else:
-                logger.warning(f"订单上报失败: HTTP {resp.status_code}")
-                return {"success": False, "error": f"HTTP {resp.status_code}"}
+                logger.warning(f"批量上报失败: HTTP {resp.status_code}")
+                return False
                 
         except Exception as e:
-            logger.error(f"订单上报异常: {e}")
-            return {"success": False, "error": str(e)}
-    
+            logger.error(f"批量上报异常: {e}")
+            return False
+
     # ========== 配置同步 API ==========
-    
-    async def get_config(self) -> Dict[str, Any]:
+
+    async def get_config_raw(self) -> Optional[bytes]:
         """
-        获取云端配置
+        获取云端配置的原始响应字节
         
-        Returns:
-            配置信息: {
-                "strategy": {...},
-                "notification": {...},
-                "preferences": {...},
-            }
+        供调用方先做字节级变更短路，未变更时免去 JSON 解析
         """
         try:
             client = await self._get_client()
@@ -339,20 +565,43 @@ class CloudClient:
             )
             
             if resp.status_code == 200:
-                result = resp.json()
-                if result.get("success"):
-                    logger.info("云端配置获取成功")
-                    return result.get("data", {})
-                else:
-                    logger.warning(f"云端配置获取失败: {result.get('message')}")
-                    return {}
+                return resp.content
             else:
                 logger.warning(f"云端配置获取失败: HTTP {resp.status_code}")
-                return {}
+                return None
                 
         except Exception as e:
             logger.error(f"云端配置获取异常: {e}")
+            return None
+    
+    @staticmethod
+    def parse_config(raw: bytes) -> Dict[str, Any]:
+        """解析 get_config_raw 返回的响应体"""
+        result = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if result.get("success"):
+            return result.get("data", {})
+        logger.warning(f"云端配置获取失败: {result.get('message')}")
+        return {}
+    
+    async def get_config(self) -> Dict[str, Any]:
+        """
+        获取云端配置
+        
+        Returns:
+            配置信息: {
+                "strategy": {...},
+                "notification": {...},
+                "preferences": {...},
+            }
+        """
+        raw = await self.get_config_raw()
+        if raw is None:
             return {}
+        
+        config = self.parse_config(raw)
+        if config:
+            logger.info("云端配置获取成功")
+        return config
     
     # ========== 对冲计算 API ==========
     
@@ -378,7 +627,7 @@ class CloudClient:
             )
             
             if resp.status_code == 200:
-                return resp.json()
+                return self._parse_json(resp)
             elif resp.status_code == 401:
                 logger.error("Hedge API 调用失败: License Key 无效或未提供")
                 return {"success": False, "error": "Invalid or missing License Key"}
@@ -4,9 +4,12 @@
 从云端同步配置到本地
 """
 
+import json
+import hashlib
 import logging
 import asyncio
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from typing import Dict, Any, Optional, Callable
 from cloud.client import CloudClient
 
@@ -20,8 +23,9 @@ class ConfigSync:
         self.client = cloud_client
         self.sync_interval = sync_interval  # 同步间隔（秒）
         self._running = False
-        self._background_task: Optional[asyncio.Task] = None
         self._last_sync: Optional[datetime] = None
+        self._config_hash: Optional[bytes] = None
+        self._last_raw: Optional[bytes] = None
         
         # 当前配置
         self.strategy_config: Dict[str, Any] = {}
@@ -30,6 +34,41 @@ class ConfigSync:
         
         # 配置变更回调
         self._on_config_change: Optional[Callable[[Dict[str, Any]], None]] = None
+        
+        # 预解析的类型化配置缓存 (仅在配置变更时重建，getter 直接读属性)
+        self._cache = SimpleNamespace()
+        self._rebuild_cache()
+        
+        # 状态字典缓存 (脏标记失效，高频轮询时免重建)
+        self._status_dirty = True
+        self._cached_status: Dict[str, Any] = {}
+    
+    def _rebuild_cache(self):
+        """重建类型化配置缓存 (把 float/int 转换从热路径挪到同步时)"""
+        strategy = self.strategy_config
+        notification = self.notification_config
+        preferences = self.preferences
+        c = self._cache
+        c.rebalance_threshold = float(strategy.get("rebalanceThreshold", "0.02"))
+        c.rebalance_interval = int(strategy.get("rebalanceInterval", 300))
+        c.leverage = int(strategy.get("leverage", 1))
+        c.use_maker_order = strategy.get("useMakerOrder", True)
+        c.order_timeout = int(strategy.get("orderTimeout", 60))
+        c.split_order_enabled = strategy.get("splitOrderEnabled", True)
+        c.split_order_threshold = float(strategy.get("splitOrderThreshold", "1500"))
+        c.telegram_enabled = notification.get("telegramEnabled", False)
+        c.telegram_config = {
+            "bot_token": notification.get("telegramBotToken", ""),
+            "chat_id": notification.get("telegramChatId", ""),
+        }
+        c.wecom_enabled = notification.get("wecomEnabled", False)
+        c.wecom_webhook = notification.get("wecomWebhook", "")
+        c.notify_on_profit = preferences.get("notifyOnProfit", True)
+        c.notify_on_loss = preferences.get("notifyOnLoss", True)
+        c.notify_on_rebalance = preferences.get("notifyOnRebalance", False)
+        c.notify_on_alert = preferences.get("notifyOnAlert", True)
+        c.daily_report = preferences.get("dailyReport", True)
+        c.daily_report_time = preferences.get("dailyReportTime", "20:00")
     
     def set_on_config_change(self, callback: Callable[[Dict[str, Any]], None]):
         """设置配置变更回调函数"""
@@ -43,36 +82,50 @@ class ConfigSync:
             是否同步成功
         """
         try:
-            config = await self.client.get_config()
+            raw = await self.client.get_config_raw()
+            
+            if raw is None:
+                return False
+            
+            # 响应字节与上次一致: 完全跳过解析和变更检测
+            if raw == self._last_raw:
+                self._last_sync = datetime.now()
+                self._status_dirty = True
+                logger.debug("配置同步成功 (无变更)")
+                return True
+            
+            self._last_raw = raw
+            config = self.client.parse_config(raw)
             
             if not config:
                 logger.warning("云端配置为空")
                 return False
             
-            # 检查配置是否有变化
-            old_config = {
-                "strategy": self.strategy_config,
-                "notification": self.notification_config,
-                "preferences": self.preferences,
-            }
+            # 用稳定哈希检测变更，避免每次同步做递归深比较
+            new_hash = hashlib.blake2b(
+                json.dumps(config, sort_keys=True, separators=(",", ":")).encode(),
+                digest_size=16,
+            ).digest()
+            changed = new_hash != self._config_hash
             
-            # 更新配置
-            self.strategy_config = config.get("strategy", {})
-            self.notification_config = config.get("notification", {})
-            self.preferences = config.get("preferences", {})
+            if changed:
+                # 更新配置
+                self.strategy_config = config.get("strategy", {})
+                self.notification_config = config.get("notification", {})
+                self.preferences = config.get("preferences", {})
+                self._config_hash = new_hash
+                self._rebuild_cache()
             
             self._last_sync = datetime.now()
+            self._status_dirty = True
             
-            # 检查是否有变化
-            new_config = {
-                "strategy": self.strategy_config,
-                "notification": self.notification_config,
-                "preferences": self.preferences,
-            }
-            
-            if old_config != new_config and self._on_config_change:
+            if changed and self._on_config_change:
                 logger.info("检测到配置变更，触发回调")
-                self._on_config_change(new_config)
+                self._on_config_change({
+                    "strategy": self.strategy_config,
+                    "notification": self.notification_config,
+                    "preferences": self.preferences,
+                })
             
             logger.debug("配置同步成功")
             return True
@@ -81,124 +134,106 @@ class ConfigSync:
             logger.error(f"配置同步异常: {e}")
             return False
     
-    async def start_background_sync(self):
-        """启动后台同步任务"""
+    async def start_background_sync(self, scheduler):
+        """把周期同步注册到共享云端调度器"""
         self._running = True
+        self._status_dirty = True
         
         # 先执行一次同步
         await self.sync()
         
-        # 启动后台任务
-        self._background_task = asyncio.create_task(self._background_sync_loop())
-        logger.info(f"配置同步任务已启动 (间隔: {self.sync_interval}s)")
+        scheduler.add_job(self.sync, self.sync_interval, name="config_sync")
+        logger.info(f"配置同步任务已注册 (间隔: {self.sync_interval}s)")
     
     async def stop_background_sync(self):
-        """停止后台同步任务"""
+        """停止后台同步 (调度循环由 CloudScheduler 统一停止)"""
         self._running = False
-        if self._background_task:
-            self._background_task.cancel()
-            try:
-                await self._background_task
-            except asyncio.CancelledError:
-                pass
-            self._background_task = None
+        self._status_dirty = True
         logger.info("配置同步任务已停止")
     
-    async def _background_sync_loop(self):
-        """后台同步循环"""
-        while self._running:
-            try:
-                await asyncio.sleep(self.sync_interval)
-                await self.sync()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"配置同步异常: {e}")
-                await asyncio.sleep(60)
-    
     # ========== 配置获取接口 ==========
     
     def get_rebalance_threshold(self) -> float:
         """获取调仓阈值"""
-        return float(self.strategy_config.get("rebalanceThreshold", "0.02"))
+        return self._cache.rebalance_threshold
     
     def get_rebalance_interval(self) -> int:
         """获取调仓间隔（秒）"""
-        return int(self.strategy_config.get("rebalanceInterval", 300))
+        return self._cache.rebalance_interval
     
     def get_leverage(self) -> int:
         """获取杠杆倍数"""
-        return int(self.strategy_config.get("leverage", 1))
+        return self._cache.leverage
     
     def is_maker_order_enabled(self) -> bool:
         """是否启用 Maker 订单"""
-        return self.strategy_config.get("useMakerOrder", True)
+        return self._cache.use_maker_order
     
     def get_order_timeout(self) -> int:
         """获取订单超时时间（秒）"""
-        return int(self.strategy_config.get("orderTimeout", 60))
+        return self._cache.order_timeout
     
     def is_split_order_enabled(self) -> bool:
         """是否启用拆单"""
-        return self.strategy_config.get("splitOrderEnabled", True)
+        return self._cache.split_order_enabled
     
     def get_split_order_threshold(self) -> float:
         """获取拆单阈值（USD）"""
-        return float(self.strategy_config.get("splitOrderThreshold", "1500"))
+        return self._cache.split_order_threshold
     
     def is_telegram_enabled(self) -> bool:
         """是否启用 Telegram 通知"""
-        return self.notification_config.get("telegramEnabled", False)
+        return self._cache.telegram_enabled
     
     def get_telegram_config(self) -> Dict[str, str]:
         """获取 Telegram 配置"""
-        return {
-            "bot_token": self.notification_config.get("telegramBotToken", ""),
-            "chat_id": self.notification_config.get("telegramChatId", ""),
-        }
+        return self._cache.telegram_config
     
     def is_wecom_enabled(self) -> bool:
         """是否启用企业微信通知"""
-        return self.notification_config.get("wecomEnabled", False)
+        return self._cache.wecom_enabled
     
     def get_wecom_webhook(self) -> str:
         """获取企业微信 Webhook"""
-        return self.notification_config.get("wecomWebhook", "")
+        return self._cache.wecom_webhook
     
     def should_notify_on_profit(self) -> bool:
         """盈利时是否通知"""
-        return self.preferences.get("notifyOnProfit", True)
+        return self._cache.notify_on_profit
     
     def should_notify_on_loss(self) -> bool:
         """亏损时是否通知"""
-        return self.preferences.get("notifyOnLoss", True)
+        return self._cache.notify_on_loss
     
     def should_notify_on_rebalance(self) -> bool:
         """调仓时是否通知"""
-        return self.preferences.get("notifyOnRebalance", False)
+        return self._cache.notify_on_rebalance
     
     def should_notify_on_alert(self) -> bool:
         """告警时是否通知"""
-        return self.preferences.get("notifyOnAlert", True)
+        return self._cache.notify_on_alert
     
     def is_daily_report_enabled(self) -> bool:
         """是否启用每日报告"""
-        return self.preferences.get("dailyReport", True)
+        return self._cache.daily_report
     
     def get_daily_report_time(self) -> str:
         """获取每日报告时间"""
-        return self.preferences.get("dailyReportTime", "20:00")
+        return self._cache.daily_report_time
     
     def get_status(self) -> Dict[str, Any]:
-        """获取同步状态"""
-        return {
-            "running": self._running,
-            "sync_interval": self.sync_interval,
-            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
-            "strategy_config": self.strategy_config,
-            "notification_config": {
-                "telegram_enabled": self.is_telegram_enabled(),
-                "wecom_enabled": self.is_wecom_enabled(),
-            },
-            "preferences": self.preferences,
-        }
+        """获取同步状态 (脏标记命中时直接返回缓存副本)"""
+        if self._status_dirty:
+            self._cached_status = {
+                "running": self._running,
+                "sync_interval": self.sync_interval,
+                "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+                "strategy_config": self.strategy_config,
+                "notification_config": {
+                    "telegram_enabled": self.is_telegram_enabled(),
+                    "wecom_enabled": self.is_wecom_enabled(),
+                },
+                "preferences": self.preferences,
+            }
+            self._status_dirty = False
+        return dict(self._cached_status)
@@ -4,30 +4,187 @@
 定期上报净值、订单、告警等数据到云端
 """
 
+import time
 import logging
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
-from collections import deque
+from dataclasses import dataclass
 from cloud.client import CloudClient
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class OrderRecord:
+    """待上报订单记录 (slots 对象比 15 键字典更省内存、写入更快)"""
+    order_id: str = ""
+    client_order_id: Optional[str] = None
+    symbol: str = ""
+    side: str = ""
+    order_type: str = ""
+    amount: float = 0.0
+    price: Optional[float] = None
+    filled_amount: Optional[float] = None
+    avg_price: Optional[float] = None
+    fee: Optional[float] = None
+    fee_asset: Optional[str] = None
+    status: str = ""
+    error_message: Optional[str] = None
+    rebalance_id: Optional[str] = None
+    order_time: Optional[str] = None
+    update_time: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "order_id": self.order_id,
+            "client_order_id": self.client_order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "order_type": self.order_type,
+            "amount": self.amount,
+            "price": self.price,
+            "filled_amount": self.filled_amount,
+            "avg_price": self.avg_price,
+            "fee": self.fee,
+            "fee_asset": self.fee_asset,
+            "status": self.status,
+            "error_message": self.error_message,
+            "rebalance_id": self.rebalance_id,
+            "order_time": self.order_time,
+            "update_time": self.update_time,
+        }
+
+
+@dataclass(slots=True)
+class AlertRecord:
+    """待上报告警记录"""
+    alert_type: str = ""
+    level: str = ""
+    title: str = ""
+    message: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alert_type": self.alert_type,
+            "level": self.level,
+            "title": self.title,
+            "message": self.message,
+        }
+
+
+@dataclass(slots=True)
+class RebalanceRecord:
+    """待上报调仓记录"""
+    symbol: str = ""
+    side: str = ""
+    amount: float = 0.0
+    price: Optional[float] = None
+    status: str = ""
+    before_position: Optional[float] = None
+    after_position: Optional[float] = None
+    reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "side": self.side,
+            "amount": self.amount,
+            "price": self.price,
+            "status": self.status,
+            "before_position": self.before_position,
+            "after_position": self.after_position,
+            "reason": self.reason,
+        }
+
+
+@dataclass(slots=True)
+class EquitySnapshot:
+    """净值快照 (单实例复用，交易循环只做属性写)"""
+    jlp_amount: float = 0.0
+    jlp_price: float = 0.0
+    jlp_value_usd: float = 0.0
+    total_equity_usd: float = 0.0
+    unrealized_pnl: float = 0.0
+    margin_ratio: float = 0.0
+    hedge_ratio: float = 0.0
+    positions: Optional[Dict[str, Any]] = None
+    ts: float = 0.0
+
+
+class _RecordRing:
+    """预分配 slot 记录的环形缓冲
+    
+    容量固定，入队时复用既有记录对象就地覆写字段，热路径零分配;
+    满时覆盖最旧记录 (语义同 deque(maxlen=N))
+    """
+    
+    __slots__ = ("_buf", "_capacity", "_head", "_count", "dropped")
+    
+    def __init__(self, factory, capacity: int):
+        self._buf = [factory() for _ in range(capacity)]
+        self._capacity = capacity
+        self._head = 0  # 最旧记录下标
+        self._count = 0
+        self.dropped = 0  # 因溢出被覆盖的记录累计数
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def acquire(self):
+        """返回下一个可写槽位的记录对象 (满时覆盖最旧)"""
+        idx = (self._head + self._count) % self._capacity
+        if self._count == self._capacity:
+            self._head = (self._head + 1) % self._capacity
+            self.dropped += 1
+        else:
+            self._count += 1
+        return self._buf[idx]
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """按入队顺序导出为 dict 列表"""
+        head, cap, buf = self._head, self._capacity, self._buf
+        return [buf[(head + i) % cap].to_dict() for i in range(self._count)]
+    
+    def consume(self, n: int):
+        """移除最旧的 n 条记录 (上报成功后调用)"""
+        n = max(0, min(n, self._count))
+        self._head = (self._head + n) % self._capacity
+        self._count -= n
+
+
 class DataReporter:
     """数据上报器"""
     
-    def __init__(self, cloud_client: CloudClient, report_interval: int = 300):
+    def __init__(
+        self,
+        cloud_client: CloudClient,
+        report_interval: int = 300,
+        account_name: Optional[str] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
         self.client = cloud_client
+        # 账户上下文随调用传递，多个上报器可共享同一个客户端
+        self.account_name = account_name or cloud_client.account_name
         self.report_interval = report_interval  # 上报间隔（秒）
+        # 出站并发闸: 多账户上报共享时防止同时打爆 SaaS API
+        self._api_sem = semaphore if semaphore is not None else asyncio.Semaphore(8)
         self._running = False
-        self._background_task: Optional[asyncio.Task] = None
         
-        # 数据缓存队列
-        self._equity_data: Optional[Dict[str, Any]] = None
-        self._order_queue: deque = deque(maxlen=100)  # 最多缓存 100 条订单
-        self._alert_queue: deque = deque(maxlen=50)   # 最多缓存 50 条告警
-        self._rebalance_queue: deque = deque(maxlen=50)  # 最多缓存 50 条调仓
+        # 数据缓存 (环形缓冲，容量即原 deque maxlen)
+        self._equity = EquitySnapshot()
+        self._equity_dirty = False  # 有未上报的净值快照
+        self._order_ring = _RecordRing(OrderRecord, 100)      # 最多缓存 100 条订单
+        self._alert_ring = _RecordRing(AlertRecord, 50)       # 最多缓存 50 条告警
+        self._rebalance_ring = _RecordRing(RebalanceRecord, 50)  # 最多缓存 50 条调仓
+        
+        # build_payload 导出后、批量 POST 成功前的待消费标记
+        self._pending_marks: Optional[list] = None
+        self._pending_equity = False
+        
+        # 状态字典缓存 (脏标记失效，高频轮询时免重建)
+        self._status_dirty = True
+        self._cached_status: Dict[str, Any] = {}
     
     # ========== 数据收集接口 ==========
     
@@ -42,18 +199,19 @@ class DataReporter:
         hedge_ratio: float = 0,
         positions: Optional[Dict[str, Any]] = None,
     ):
-        """更新净值数据（待上报）"""
-        self._equity_data = {
-            "jlp_amount": jlp_amount,
-            "jlp_price": jlp_price,
-            "jlp_value_usd": jlp_value_usd,
-            "total_equity_usd": total_equity_usd,
-            "unrealized_pnl": unrealized_pnl,
-            "margin_ratio": margin_ratio,
-            "hedge_ratio": hedge_ratio,
-            "positions": positions or {},
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        }
+        """更新净值数据（待上报，只写快照属性，dict 构建推迟到上报时）"""
+        eq = self._equity
+        eq.jlp_amount = jlp_amount
+        eq.jlp_price = jlp_price
+        eq.jlp_value_usd = jlp_value_usd
+        eq.total_equity_usd = total_equity_usd
+        eq.unrealized_pnl = unrealized_pnl
+        eq.margin_ratio = margin_ratio
+        eq.hedge_ratio = hedge_ratio
+        eq.positions = positions
+        eq.ts = time.time()
+        self._equity_dirty = True
+        self._status_dirty = True
         logger.debug(f"净值数据已更新: JLP={jlp_amount:.2f}, 价值=${jlp_value_usd:.2f}")
     
     def add_order(
@@ -76,24 +234,24 @@ class DataReporter:
         update_time: Optional[datetime] = None,
     ):
         """添加订单记录（待上报）"""
-        self._order_queue.append({
-            "order_id": order_id,
-            "client_order_id": client_order_id,
-            "symbol": symbol,
-            "side": side,
-            "order_type": order_type,
-            "amount": amount,
-            "price": price,
-            "filled_amount": filled_amount,
-            "avg_price": avg_price,
-            "fee": fee,
-            "fee_asset": fee_asset,
-            "status": status,
-            "error_message": error_message,
-            "rebalance_id": rebalance_id,
-            "order_time": order_time.isoformat() if order_time else None,
-            "update_time": update_time.isoformat() if update_time else None,
-        })
+        rec = self._order_ring.acquire()
+        rec.order_id = order_id
+        rec.client_order_id = client_order_id
+        rec.symbol = symbol
+        rec.side = side
+        rec.order_type = order_type
+        rec.amount = amount
+        rec.price = price
+        rec.filled_amount = filled_amount
+        rec.avg_price = avg_price
+        rec.fee = fee
+        rec.fee_asset = fee_asset
+        rec.status = status
+        rec.error_message = error_message
+        rec.rebalance_id = rebalance_id
+        rec.order_time = order_time.isoformat() if order_time else None
+        rec.update_time = update_time.isoformat() if update_time else None
+        self._status_dirty = True
     
     def add_alert(
         self,
@@ -103,12 +261,12 @@ class DataReporter:
         message: str,
     ):
         """添加告警记录（待上报）"""
-        self._alert_queue.append({
-            "alert_type": alert_type,
-            "level": level,
-            "title": title,
-            "message": message,
-        })
+        rec = self._alert_ring.acquire()
+        rec.alert_type = alert_type
+        rec.level = level
+        rec.title = title
+        rec.message = message
+        self._status_dirty = True
     
     def add_rebalance(
         self,
@@ -122,142 +280,188 @@ class DataReporter:
         reason: Optional[str] = None,
     ):
         """添加调仓记录（待上报）"""
-        self._rebalance_queue.append({
-            "symbol": symbol,
-            "side": side,
-            "amount": amount,
-            "price": price,
-            "status": status,
-            "before_position": before_position,
-            "after_position": after_position,
-            "reason": reason,
-        })
+        rec = self._rebalance_ring.acquire()
+        rec.symbol = symbol
+        rec.side = side
+        rec.amount = amount
+        rec.price = price
+        rec.status = status
+        rec.before_position = before_position
+        rec.after_position = after_position
+        rec.reason = reason
+        self._status_dirty = True
     
     # ========== 立即上报接口 ==========
     
+    def _build_equity_payload(self) -> Dict[str, Any]:
+        """把净值快照展开成上报 dict (冷路径，仅在实际上报时执行)"""
+        eq = self._equity
+        return {
+            "jlp_amount": eq.jlp_amount,
+            "jlp_price": eq.jlp_price,
+            "jlp_value_usd": eq.jlp_value_usd,
+            "total_equity_usd": eq.total_equity_usd,
+            "unrealized_pnl": eq.unrealized_pnl,
+            "margin_ratio": eq.margin_ratio,
+            "hedge_ratio": eq.hedge_ratio,
+            "positions": eq.positions or {},
+            "timestamp": datetime.fromtimestamp(eq.ts, tz=timezone.utc).isoformat(),
+        }
+    
     async def report_equity_now(self) -> bool:
         """立即上报净值数据"""
-        if not self._equity_data:
+        if not self._equity_dirty:
             return True
         
-        success = await self.client.report_equity(self._equity_data)
+        async with self._api_sem:
+            success = await self.client.report_equity(
+                self._build_equity_payload(), account_name=self.account_name
+            )
         if success:
-            self._equity_data = None
+            self._equity_dirty = False
+            self._status_dirty = True
         return success
     
     async def report_orders_now(self) -> bool:
-        """立即上报所有待上报订单"""
-        if not self._order_queue:
+        """立即上报所有待上报订单 (成功后按条数消费，失败时记录原地保留)"""
+        if not len(self._order_ring):
             return True
         
-        orders = list(self._order_queue)
-        result = await self.client.report_orders(orders)
+        orders = self._order_ring.to_dicts()
+        dropped_before = self._order_ring.dropped
+        
+        async with self._api_sem:
+            result = await self.client.report_orders(orders)
         
         if result.get("success"):
-            self._order_queue.clear()
+            # POST 期间溢出覆盖掉的旧记录不再重复消费
+            overwritten = self._order_ring.dropped - dropped_before
+            self._order_ring.consume(len(orders) - overwritten)
+            self._status_dirty = True
             return True
         return False
     
     async def report_alerts_now(self) -> bool:
-        """立即上报所有待上报告警"""
-        if not self._alert_queue:
+        """立即上报所有待上报告警 (整队列单次 POST)"""
+        if not len(self._alert_ring):
             return True
         
-        success = True
-        while self._alert_queue:
-            alert = self._alert_queue.popleft()
-            if not await self.client.report_alert(alert):
-                # 上报失败，放回队列
-                self._alert_queue.appendleft(alert)
-                success = False
-                break
+        alerts = self._alert_ring.to_dicts()
+        dropped_before = self._alert_ring.dropped
         
+        async with self._api_sem:
+            success = await self.client.report_alerts(alerts, account_name=self.account_name)
+        if success:
+            overwritten = self._alert_ring.dropped - dropped_before
+            self._alert_ring.consume(len(alerts) - overwritten)
+            self._status_dirty = True
         return success
     
     async def report_rebalances_now(self) -> bool:
-        """立即上报所有待上报调仓"""
-        if not self._rebalance_queue:
+        """立即上报所有待上报调仓 (整队列单次 POST)"""
+        if not len(self._rebalance_ring):
             return True
         
-        success = True
-        while self._rebalance_queue:
-            rebalance = self._rebalance_queue.popleft()
-            if not await self.client.report_rebalance(rebalance):
-                # 上报失败，放回队列
-                self._rebalance_queue.appendleft(rebalance)
-                success = False
-                break
+        rebalances = self._rebalance_ring.to_dicts()
+        dropped_before = self._rebalance_ring.dropped
         
+        async with self._api_sem:
+            success = await self.client.report_rebalances(rebalances, account_name=self.account_name)
+        if success:
+            overwritten = self._rebalance_ring.dropped - dropped_before
+            self._rebalance_ring.consume(len(rebalances) - overwritten)
+            self._status_dirty = True
         return success
     
+    def build_payload(self) -> Optional[Dict[str, Any]]:
+        """组装本账户的待上报分节 (纯内存无 I/O，空转时返回 None)
+        
+        POST 成功后须调用 commit_payload 消费导出的条目
+        """
+        # 空转 tick 直接返回，不做任何构建工作
+        if not (
+            self._equity_dirty
+            or len(self._order_ring)
+            or len(self._alert_ring)
+            or len(self._rebalance_ring)
+        ):
+            return None
+        
+        payload: Dict[str, Any] = {}
+        marks = []
+        if self._equity_dirty:
+            payload["equity"] = self._build_equity_payload()
+        self._pending_equity = self._equity_dirty
+        for key, ring in (
+            ("orders", self._order_ring),
+            ("alerts", self._alert_ring),
+            ("rebalances", self._rebalance_ring),
+        ):
+            if len(ring):
+                payload[key] = ring.to_dicts()
+                marks.append((ring, len(payload[key]), ring.dropped))
+        self._pending_marks = marks
+        return payload
+    
+    def commit_payload(self):
+        """上报成功后消费 build_payload 导出的条目
+        
+        只消费已上报的部分，POST 期间新入队/被溢出覆盖的数据保留到下一轮
+        """
+        if self._pending_equity:
+            self._equity_dirty = False
+            self._pending_equity = False
+        for ring, count, dropped_before in self._pending_marks or ():
+            overwritten = ring.dropped - dropped_before
+            ring.consume(count - overwritten)
+        self._pending_marks = None
+        self._status_dirty = True
+    
     async def report_all_now(self) -> bool:
-        """立即上报所有数据"""
-        results = await asyncio.gather(
-            self.report_equity_now(),
-            self.report_orders_now(),
-            self.report_alerts_now(),
-            self.report_rebalances_now(),
-            return_exceptions=True,
-        )
+        """立即上报所有数据 (合并为单次聚合 POST，空分节不占用请求)"""
+        payload = self.build_payload()
+        if payload is None:
+            return True
         
-        return all(r is True for r in results if not isinstance(r, Exception))
+        async with self._api_sem:
+            success = await self.client.report_bulk(payload, account_name=self.account_name)
+        if success:
+            self.commit_payload()
+        return success
     
     # ========== 后台上报任务 ==========
     
-    async def start_background_report(self):
-        """启动后台上报任务"""
+    async def start_background_report(self, scheduler):
+        """把周期上报注册到共享云端调度器 (首次上报延迟 30s 等初始化完成)"""
         self._running = True
-        self._background_task = asyncio.create_task(self._background_report_loop())
-        logger.info(f"数据上报任务已启动 (间隔: {self.report_interval}s)")
+        self._status_dirty = True
+        scheduler.add_job(
+            self.report_all_now,
+            self.report_interval,
+            name=f"report:{self.account_name}",
+            initial_delay=30,
+        )
+        logger.info(f"数据上报任务已注册 (间隔: {self.report_interval}s)")
     
     async def stop_background_report(self):
-        """停止后台上报任务"""
+        """停止后台上报并冲刷剩余数据"""
         self._running = False
-        if self._background_task:
-            self._background_task.cancel()
-            try:
-                await self._background_task
-            except asyncio.CancelledError:
-                pass
-            self._background_task = None
+        self._status_dirty = True
         
         # 停止前上报所有数据
         await self.report_all_now()
         logger.info("数据上报任务已停止")
     
-    async def _background_report_loop(self):
-        """后台上报循环"""
-        logger.info("后台上报循环已启动，等待 30 秒后执行首次上报...")
-        # 启动后等待 30 秒让初始化完成，然后立即上报一次
-        await asyncio.sleep(30)
-        if self._running:
-            if self._equity_data:
-                logger.info("执行首次数据上报...")
-                success = await self.report_all_now()
-                logger.info(f"首次数据上报完成: {'成功' if success else '失败'}")
-            else:
-                logger.warning("首次上报跳过: 尚无净值数据（策略可能还在初始化）")
-        
-        while self._running:
-            try:
-                await asyncio.sleep(self.report_interval)
-                
-                logger.debug("执行定期数据上报...")
-                await self.report_all_now()
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"数据上报异常: {e}")
-                await asyncio.sleep(60)  # 出错后等待 1 分钟再试
-    
     def get_status(self) -> Dict[str, Any]:
-        """获取上报状态"""
-        return {
-            "running": self._running,
-            "report_interval": self.report_interval,
-            "pending_equity": self._equity_data is not None,
-            "pending_orders": len(self._order_queue),
-            "pending_alerts": len(self._alert_queue),
-            "pending_rebalances": len(self._rebalance_queue),
-        }
+        """获取上报状态 (脏标记命中时直接返回缓存副本)"""
+        if self._status_dirty:
+            self._cached_status = {
+                "running": self._running,
+                "report_interval": self.report_interval,
+                "pending_equity": self._equity_dirty,
+                "pending_orders": len(self._order_ring),
+                "pending_alerts": len(self._alert_ring),
+                "pending_rebalances": len(self._rebalance_ring),
+            }
+            self._status_dirty = False
+        return dict(self._cached_status)
@@ -4,10 +4,16 @@ License 验证管理器
 负责 License 验证和状态维护
 """
 
+import time
+import json
+import hmac
+import hashlib
 import logging
 import asyncio
+import contextvars
+from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from cloud.client import CloudClient
 
 logger = logging.getLogger(__name__)
@@ -23,6 +29,9 @@ class LicenseManager:
         "free": 0,        # 免费版：不支持
     }
     
+    # 本地缓存有效期: 命中期间启动免网络往返，过期后强制在线验证
+    CACHE_TTL = timedelta(hours=24)
+    
     def __init__(self, cloud_client: CloudClient):
         self.client = cloud_client
         self.is_valid = False
@@ -31,35 +40,127 @@ class LicenseManager:
         self.max_accounts: int = 1  # 默认单账户
         self.expires_at: Optional[datetime] = None
         self.cloud_config: Dict[str, Any] = {}
-        self._last_check: Optional[datetime] = None
+        self._last_check: Optional[datetime] = None  # 仅用于状态展示
         self._check_interval = timedelta(hours=1)  # 1小时检查一次
-        self._background_task: Optional[asyncio.Task] = None
+        self._next_check_monotonic: float = 0.0
+        # verify() 时重建的账户数判定闭包 (热路径免属性链查找)
+        self._can_use_accounts: "Callable[[int], bool]" = lambda n: False
+        
+        # 状态字典缓存 (脏标记失效，高频轮询时免重建)
+        self._status_dirty = True
+        self._cached_status: Dict[str, Any] = {}
+
+        # 在途的后台刷新任务 (持有强引用防 GC，完成后自动移除)
+        self._bg_tasks: set = set()
+    
+    def _rebuild_account_predicate(self):
+        """按当前验证结果特化 can_use_accounts 的判定闭包"""
+        if self.is_valid:
+            self._can_use_accounts = lambda n, m=self.max_accounts: n <= m
+        else:
+            self._can_use_accounts = lambda n: False
+    
+    # ========== 本地验证缓存 ==========
+    
+    @staticmethod
+    def _cache_file() -> Path:
+        """缓存文件路径 (优先 Docker 挂载的 data 目录)"""
+        docker_path = Path("/app/data/license.cache.json")
+        if docker_path.parent.exists():
+            return docker_path
+        return Path(__file__).parent.parent / "data" / "license.cache.json"
+    
+    def _sign_payload(self, payload: Dict[str, Any]) -> str:
+        """以 license_key 为密钥对缓存内容做 HMAC 签名"""
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return hmac.new(
+            self.client.config.license_key.encode("utf-8"), raw, hashlib.sha256
+        ).hexdigest()
+    
+    def _load_cached_verification(self) -> Optional[Dict[str, Any]]:
+        """读取本地验证缓存 (签名失配或超出 TTL 即失效)"""
+        try:
+            blob = json.loads(self._cache_file().read_text())
+            payload = blob.get("payload") or {}
+            if not hmac.compare_digest(blob.get("sig", ""), self._sign_payload(payload)):
+                return None
+            cached_at = datetime.fromisoformat(payload["cached_at"])
+            if datetime.now() - cached_at > self.CACHE_TTL:
+                return None
+            if not payload.get("valid"):
+                return None
+            return payload
+        except Exception:
+            return None
+    
+    def _store_cached_verification(self, result: Dict[str, Any]):
+        """持久化最近一次成功的验证结果"""
+        payload = {
+            key: result.get(key)
+            for key in ("valid", "user_id", "plan_type", "max_accounts", "expires_at", "config")
+        }
+        payload["cached_at"] = datetime.now().isoformat()
+        try:
+            cache_file = self._cache_file()
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(
+                json.dumps({"payload": payload, "sig": self._sign_payload(payload)})
+            )
+        except Exception:
+            pass  # 缓存写入失败不影响运行
+    
+    def _apply_verification(self, result: Dict[str, Any]):
+        """把验证结果写入管理器状态"""
+        self.is_valid = True
+        self.user_id = result.get("user_id")
+        self.plan_type = result.get("plan_type", "unknown")
+        self.max_accounts = result.get("max_accounts", self.PLAN_ACCOUNT_LIMITS.get(self.plan_type, 1))
+        self.cloud_config = result.get("config", {})
+        
+        # 解析过期时间
+        expires_at_str = result.get("expires_at")
+        if expires_at_str:
+            self.expires_at = datetime.fromisoformat(
+                expires_at_str.replace("Z", "+00:00")
+            )
+        
+        self._last_check = datetime.now()
+        self._next_check_monotonic = (
+            time.monotonic() + self._check_interval.total_seconds()
+        )
+        
+        self._rebuild_account_predicate()
+        self._status_dirty = True
     
     async def verify(self) -> bool:
         """
-        验证 License
+        验证 License (优先命中本地缓存，命中时后台在线刷新)
         
         Returns:
             是否验证成功
         """
+        cached = self._load_cached_verification()
+        if cached is not None:
+            self._apply_verification(cached)
+            logger.info(f"License 缓存命中: {self.plan_type} 计划 (后台刷新验证)")
+            task = asyncio.get_running_loop().create_task(
+                self._refresh(), context=contextvars.Context()
+            )
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
+            return True
+        
+        return await self._refresh()
+    
+    async def _refresh(self) -> bool:
+        """在线验证并刷新本地缓存"""
+        self._status_dirty = True
         try:
             result = await self.client.verify_license()
             
             if result.get("valid"):
-                self.is_valid = True
-                self.user_id = result.get("user_id")
-                self.plan_type = result.get("plan_type", "unknown")
-                self.max_accounts = result.get("max_accounts", self.PLAN_ACCOUNT_LIMITS.get(self.plan_type, 1))
-                self.cloud_config = result.get("config", {})
-                
-                # 解析过期时间
-                expires_at_str = result.get("expires_at")
-                if expires_at_str:
-                    self.expires_at = datetime.fromisoformat(
-                        expires_at_str.replace("Z", "+00:00")
-                    )
-                
-                self._last_check = datetime.now()
+                self._apply_verification(result)
+                self._store_cached_verification(result)
                 
                 logger.info(f"License 验证成功: {self.plan_type} 计划")
                 if self.expires_at:
@@ -68,6 +169,7 @@ class LicenseManager:
                 return True
             else:
                 self.is_valid = False
+                self._rebuild_account_predicate()
                 error = result.get("error", "Unknown error")
                 logger.error(f"License 验证失败: {error}")
                 return False
@@ -75,13 +177,12 @@ class LicenseManager:
         except Exception as e:
             logger.error(f"License 验证异常: {e}")
             self.is_valid = False
+            self._rebuild_account_predicate()
             return False
     
     def needs_refresh(self) -> bool:
-        """检查是否需要刷新验证"""
-        if not self._last_check:
-            return True
-        return datetime.now() - self._last_check > self._check_interval
+        """检查是否需要刷新验证 (monotonic 截止时间，不受系统时钟回拨影响)"""
+        return time.monotonic() >= self._next_check_monotonic
     
     def is_expiring_soon(self, days: int = 7) -> bool:
         """检查 License 是否即将过期"""
@@ -96,58 +197,55 @@ class LicenseManager:
         delta = self.expires_at - datetime.now(self.expires_at.tzinfo)
         return max(0, delta.days)
     
-    async def start_background_check(self):
-        """启动后台验证任务"""
-        self._background_task = asyncio.create_task(self._background_check_loop())
-        logger.info("License 后台检查任务已启动")
+    async def check_once(self):
+        """单次周期检查: 刷新验证并提示即将过期"""
+        if not self.needs_refresh():
+            return
+        
+        logger.debug("执行定期 License 验证...")
+        await self.verify()
+        
+        # 检查是否即将过期
+        if self.is_valid and self.is_expiring_soon(7):
+            remaining = self.get_remaining_days()
+            logger.warning(f"License 即将过期，剩余 {remaining} 天")
+    
+    async def start_background_check(self, scheduler):
+        """把周期验证注册到共享云端调度器"""
+        scheduler.add_job(
+            self.check_once,
+            self._check_interval.total_seconds(),
+            name="license_check",
+        )
+        logger.info("License 后台检查任务已注册")
     
     async def stop_background_check(self):
-        """停止后台验证任务"""
-        if self._background_task:
-            self._background_task.cancel()
-            try:
-                await self._background_task
-            except asyncio.CancelledError:
-                pass
-            self._background_task = None
-            logger.info("License 后台检查任务已停止")
-    
-    async def _background_check_loop(self):
-        """后台验证循环"""
-        while True:
-            try:
-                await asyncio.sleep(self._check_interval.total_seconds())
-                
-                if self.needs_refresh():
-                    logger.debug("执行定期 License 验证...")
-                    await self.verify()
-                    
-                    # 检查是否即将过期
-                    if self.is_valid and self.is_expiring_soon(7):
-                        remaining = self.get_remaining_days()
-                        logger.warning(f"License 即将过期，剩余 {remaining} 天")
-                        
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"License 后台检查异常: {e}")
-                await asyncio.sleep(60)  # 出错后等待 1 分钟再试
+        """停止后台验证 (调度循环由 CloudScheduler 统一停止)"""
+        if self._bg_tasks:
+            for task in self._bg_tasks:
+                task.cancel()
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+            self._bg_tasks.clear()
+        logger.info("License 后台检查任务已停止")
     
     def get_status(self) -> Dict[str, Any]:
-        """获取 License 状态"""
-        return {
-            "is_valid": self.is_valid,
-            "user_id": self.user_id,
-            "plan_type": self.plan_type,
-            "max_accounts": self.max_accounts,
-            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
-            "remaining_days": self.get_remaining_days(),
-            "last_check": self._last_check.isoformat() if self._last_check else None,
-        }
+        """获取 License 状态 (脏标记命中时直接返回缓存副本)"""
+        if self._status_dirty:
+            self._cached_status = {
+                "is_valid": self.is_valid,
+                "user_id": self.user_id,
+                "plan_type": self.plan_type,
+                "max_accounts": self.max_accounts,
+                "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+                "remaining_days": self.get_remaining_days(),
+                "last_check": self._last_check.isoformat() if self._last_check else None,
+            }
+            self._status_dirty = False
+        return dict(self._cached_status)
     
     def can_use_accounts(self, account_count: int) -> bool:
         """检查是否可以使用指定数量的账户"""
-        return self.is_valid and account_count <= self.max_accounts
+        return self._can_use_accounts(account_count)
     
     def get_max_accounts(self) -> int:
         """获取最大允许账户数"""
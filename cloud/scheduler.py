@@ -0,0 +1,122 @@
+"""
+云端后台任务调度器
+
+把配置同步、数据上报、License 检查合并到单个调度循环:
+一次事件循环唤醒派发所有到期任务，替代三个各自带定时器的后台 Task
+
+任务异常时按指数退避 + 抖动重试，避免云端故障期间所有部署同步重试
+"""
+
+import heapq
+import random
+import logging
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CloudScheduler:
+    """单循环周期任务调度器 (最小堆按截止时间派发)"""
+
+    # 异常退避参数（秒）
+    BACKOFF_INITIAL = 5.0
+    BACKOFF_MAX = 600.0
+
+    def __init__(self):
+        # 堆元素: (deadline, 序号, 名称, 回调, 间隔)
+        self._heap: List[Tuple[float, int, str, Callable[[], Awaitable[Any]], float]] = []
+        self._seq = 0  # 保证同截止时间任务的稳定排序
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()  # 停机时立即唤醒睡眠中的调度循环
+        # 按任务名记录当前退避时长，成功后复位
+        self._backoff: dict = {}
+
+    def add_job(
+        self,
+        callback: Callable[[], Awaitable[Any]],
+        interval: float,
+        name: str = "",
+        initial_delay: Optional[float] = None,
+    ):
+        """
+        注册周期任务
+
+        Args:
+            callback: 无参协程函数
+            interval: 执行间隔（秒）
+            name: 任务名（用于日志）
+            initial_delay: 首次执行延迟，默认等于 interval
+        """
+        loop = asyncio.get_event_loop()
+        delay = interval if initial_delay is None else initial_delay
+        heapq.heappush(
+            self._heap,
+            (loop.time() + delay, self._seq, name or callback.__qualname__, callback, interval),
+        )
+        self._seq += 1
+
+    async def start(self):
+        """启动调度循环"""
+        if self._running:
+            return
+        self._running = True
+        self._stop.clear()
+        # 空 Context 启动，调度循环不继承调用方 contextvars
+        self._task = asyncio.get_running_loop().create_task(
+            self._run_loop(), context=contextvars.Context()
+        )
+        logger.info(f"云端调度器已启动 ({len(self._heap)} 个周期任务)")
+
+    async def stop(self):
+        """停止调度循环 (事件唤醒，不经由 CancelledError 展开)"""
+        self._running = False
+        self._stop.set()
+        if self._task:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("云端调度器已停止")
+
+    async def _run_loop(self):
+        """调度循环: 睡到最早截止时间，执行到期任务后按间隔重新入堆"""
+        loop = asyncio.get_running_loop()
+        while self._running and self._heap:
+            deadline, _, name, callback, interval = self._heap[0]
+            delay = deadline - loop.time()
+            if delay > 0:
+                # 睡到最早截止时间，stop 事件可立即打断
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+
+            heapq.heappop(self._heap)
+            failed = False
+            try:
+                await callback()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                failed = True
+                logger.error(f"云端周期任务异常 [{name}]: {e}")
+
+            if failed:
+                # 指数退避 + 去相关抖动，避免各部署在云端故障后同步重试
+                backoff = self._backoff.get(name, self.BACKOFF_INITIAL)
+                self._backoff[name] = min(backoff * 2, self.BACKOFF_MAX)
+                next_deadline = loop.time() + random.uniform(0.5, 1.5) * backoff
+            else:
+                self._backoff.pop(name, None)
+                # 工作超时则跳过错过的节拍，避免补偿风暴
+                next_deadline = deadline + interval
+                now = loop.time()
+                while next_deadline < now:
+                    next_deadline += interval
+            heapq.heappush(self._heap, (next_deadline, self._seq, name, callback, interval))
+            self._seq += 1
@@ -7,25 +7,33 @@
 import os
 import json
 import logging
+import msgspec
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时回退 stdlib json
+    orjson = None
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
 
+# 环境变量类型转换表 (表驱动分发，替代链式 if)
+_ENV_CASTS = {
+    bool: lambda v: v.lower() in ('true', '1', 'yes', 'on'),
+    int: int,
+    float: float,
+    str: str,
+}
+
+
 def get_env(key: str, default: Any = None, cast_type: type = str) -> Any:
     """从环境变量获取配置，支持类型转换"""
     value = os.environ.get(key)
     if value is None:
         return default
-    if cast_type == bool:
-        return value.lower() in ('true', '1', 'yes', 'on')
-    if cast_type == int:
-        return int(value)
-    if cast_type == float:
-        return float(value)
-    return value
+    return _ENV_CASTS[cast_type](value)
 
 # 配置文件路径
 CONFIG_DIR = Path(__file__).parent
@@ -59,8 +67,7 @@ def get_accounts_file() -> Path:
 ACCOUNTS_FILE = None  # 由 load_config 动态确定
 
 
-@dataclass
-class MakerOrderSettings:
+class MakerOrderSettings(msgspec.Struct):
     """Maker 订单配置"""
     enabled: bool = True                  # 是否启用 Maker 模式
     order_timeout: float = 5.0            # 单次挂单超时 (秒)
@@ -75,21 +82,19 @@ class MakerOrderSettings:
     split_order_max_value: float = 300.0  # 单笔最大金额 (USD)
 
 
-@dataclass
-class TradingConfig:
+class TradingConfig(msgspec.Struct):
     """交易配置"""
     leverage: int = 1
     slippage: float = 0.001
-    min_order_size: Dict[str, float] = field(default_factory=lambda: {
+    min_order_size: Dict[str, float] = msgspec.field(default_factory=lambda: {
         "SOL": 0.01,
         "ETH": 0.001,
         "BTC": 0.0001
     })
-    maker_order: MakerOrderSettings = field(default_factory=MakerOrderSettings)
+    maker_order: MakerOrderSettings = msgspec.field(default_factory=MakerOrderSettings)
 
 
-@dataclass
-class AsterDexConfig:
+class AsterDexConfig(msgspec.Struct):
     """AsterDex 账户配置 - 支持 EVM 和 Solana 两种模式"""
     user_address: str
     # EVM 模式
@@ -106,40 +111,15 @@ class AsterDexConfig:
         return self.chain.lower() == "solana" or (self.api_key and self.api_secret)
 
 
-@dataclass
-class AccountConfig:
+class AccountConfig(msgspec.Struct):
     """单个账户配置"""
-    name: str
-    enabled: bool
     asterdex: AsterDexConfig
-    trading: TradingConfig
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "AccountConfig":
-        trading_data = data.get("trading", {})
-        maker_order_data = trading_data.pop("maker_order", {}) if "maker_order" in trading_data else {}
-
-        # 解析 maker_order 配置
-        maker_order = MakerOrderSettings(**maker_order_data) if maker_order_data else MakerOrderSettings()
-
-        # 构建 TradingConfig
-        trading = TradingConfig(
-            leverage=trading_data.get("leverage", 1),
-            slippage=trading_data.get("slippage", 0.001),
-            min_order_size=trading_data.get("min_order_size", {"SOL": 0.01, "ETH": 0.001, "BTC": 0.0001}),
-            maker_order=maker_order,
-        )
-
-        return cls(
-            name=data.get("name", "未命名"),
-            enabled=data.get("enabled", True),
-            asterdex=AsterDexConfig(**data.get("asterdex", {})),
-            trading=trading,
-        )
+    name: str = "未命名"
+    enabled: bool = True
+    trading: TradingConfig = msgspec.field(default_factory=TradingConfig)
 
 
-@dataclass
-class GlobalConfig:
+class GlobalConfig(msgspec.Struct):
     """全局配置"""
     hedge_api_url: str = "https://api.jlp.finance"  # 对冲计算 API
     asterdex_base_url: str = "https://fapi.asterdex.com"
@@ -152,23 +132,22 @@ class GlobalConfig:
     log_level: str = "INFO"
 
 
-@dataclass
-class CloudConfig:
+class CloudConfig(msgspec.Struct):
     """云端配置"""
     enabled: bool = False  # 是否启用云端功能
     api_url: str = "https://jlp.finance"  # SaaS 平台 URL
+    api_url_fallback: str = ""  # 备用 URL（License 验证对冲请求，可选）
     license_key: str = ""  # License Key
     report_interval: int = 300  # 数据上报间隔（秒）
     sync_interval: int = 300  # 配置同步间隔（秒）
     timeout: float = 30.0  # API 超时时间
 
 
-@dataclass
-class AppConfig:
-    """应用总配置"""
-    accounts: List[AccountConfig]
-    global_config: GlobalConfig
-    cloud: CloudConfig = field(default_factory=CloudConfig)
+class AppConfig(msgspec.Struct, rename={"global_config": "global"}):
+    """应用总配置 (msgspec 单遍 C 解码，JSON 键 global 映射到 global_config)"""
+    accounts: List[AccountConfig] = msgspec.field(default_factory=list)
+    global_config: GlobalConfig = msgspec.field(default_factory=GlobalConfig)
+    cloud: CloudConfig = msgspec.field(default_factory=CloudConfig)
 
     def get_enabled_accounts(self) -> List[AccountConfig]:
         """获取启用的账户列表"""
@@ -182,6 +161,39 @@ class AppConfig:
         return None
 
 
+class _ConfigCache(msgspec.Struct):
+    """accounts.json 解析结果的磁盘缓存 (mtime 失配即失效)"""
+    mtime_ns: int
+    config: AppConfig
+
+
+def _decode_config_file(config_file: Path) -> AppConfig:
+    """解码配置文件，优先命中 msgpack 磁盘缓存"""
+    src_mtime = config_file.stat().st_mtime_ns
+    cache_file = config_file.with_suffix(".cache.msgpack")
+
+    # 缓存命中: 二进制 blob 直接还原，跳过 JSON 解析
+    try:
+        cached = msgspec.msgpack.decode(cache_file.read_bytes(), type=_ConfigCache)
+        if cached.mtime_ns == src_mtime:
+            return cached.config
+    except Exception:
+        pass  # 缓存缺失/损坏，走完整解析
+
+    # msgspec 单遍解码为类型化结构，跳过中间 dict
+    config = msgspec.json.decode(config_file.read_bytes(), type=AppConfig)
+
+    # 写回缓存（失败不影响运行）
+    try:
+        cache_file.write_bytes(
+            msgspec.msgpack.encode(_ConfigCache(mtime_ns=src_mtime, config=config))
+        )
+    except Exception:
+        pass
+
+    return config
+
+
 def load_config(config_file: Path = None) -> AppConfig:
     """
     加载配置文件
@@ -199,37 +211,32 @@ def load_config(config_file: Path = None) -> AppConfig:
     if not config_file.exists():
         raise FileNotFoundError(f"配置文件不存在: {config_file}")
 
-    with open(config_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    accounts = [
-        AccountConfig.from_dict(acc_data)
-        for acc_data in data.get("accounts", [])
-    ]
-
-    global_config = GlobalConfig(**data.get("global", {}))
-    
-    # 加载云端配置（支持环境变量覆盖，Docker 友好）
-    cloud_data = data.get("cloud", {})
-    cloud = CloudConfig(
-        enabled=get_env("CLOUD_ENABLED", cloud_data.get("enabled", False), bool),
-        api_url=get_env("CLOUD_API_URL", cloud_data.get("api_url", "https://jlp.finance")),
-        license_key=get_env("LICENSE_KEY", cloud_data.get("license_key", "")),
-        report_interval=get_env("REPORT_INTERVAL", cloud_data.get("report_interval", 300), int),
-        sync_interval=get_env("SYNC_INTERVAL", cloud_data.get("sync_interval", 300), int),
-        timeout=get_env("CLOUD_TIMEOUT", cloud_data.get("timeout", 30.0), float),
-    )
+    config = _decode_config_file(config_file)
+    accounts = config.accounts
+
+    # 云端配置环境变量覆盖（Docker 友好）
+    cloud = config.cloud
+    cloud.enabled = get_env("CLOUD_ENABLED", cloud.enabled, bool)
+    cloud.api_url = get_env("CLOUD_API_URL", cloud.api_url)
+    cloud.api_url_fallback = get_env("CLOUD_API_URL_FALLBACK", cloud.api_url_fallback)
+    cloud.license_key = get_env("LICENSE_KEY", cloud.license_key)
+    cloud.report_interval = get_env("REPORT_INTERVAL", cloud.report_interval, int)
+    cloud.sync_interval = get_env("SYNC_INTERVAL", cloud.sync_interval, int)
+    cloud.timeout = get_env("CLOUD_TIMEOUT", cloud.timeout, float)
     
+    # 局部引用环境变量表，后续查找走局部变量
+    env = os.environ
+
     # 如果有 LICENSE_KEY 环境变量，自动启用云端
-    if os.environ.get("LICENSE_KEY") and not cloud.enabled:
+    if env.get("LICENSE_KEY") and not cloud.enabled:
         cloud.enabled = True
         logger.info("检测到 LICENSE_KEY 环境变量，自动启用云端功能")
 
     # 环境变量覆盖拆单配置（Docker 友好）
-    split_enabled = os.environ.get("SPLIT_ORDER_ENABLED")
-    split_threshold = os.environ.get("SPLIT_ORDER_THRESHOLD")
-    split_min = os.environ.get("SPLIT_ORDER_MIN_VALUE")
-    split_max = os.environ.get("SPLIT_ORDER_MAX_VALUE")
+    split_enabled = env.get("SPLIT_ORDER_ENABLED")
+    split_threshold = env.get("SPLIT_ORDER_THRESHOLD")
+    split_min = env.get("SPLIT_ORDER_MIN_VALUE")
+    split_max = env.get("SPLIT_ORDER_MAX_VALUE")
     
     if any([split_enabled, split_threshold, split_min, split_max]):
         for acc in accounts:
@@ -244,9 +251,9 @@ def load_config(config_file: Path = None) -> AppConfig:
         logger.info(f"拆单配置已覆盖: enabled={split_enabled}, threshold={split_threshold}, min={split_min}, max={split_max}")
 
     # 环境变量覆盖最小下单数量（Docker 友好）
-    min_sol = os.environ.get("MIN_ORDER_SIZE_SOL")
-    min_eth = os.environ.get("MIN_ORDER_SIZE_ETH")
-    min_btc = os.environ.get("MIN_ORDER_SIZE_BTC")
+    min_sol = env.get("MIN_ORDER_SIZE_SOL")
+    min_eth = env.get("MIN_ORDER_SIZE_ETH")
+    min_btc = env.get("MIN_ORDER_SIZE_BTC")
     
     if any([min_sol, min_eth, min_btc]):
         for acc in accounts:
@@ -267,11 +274,7 @@ def load_config(config_file: Path = None) -> AppConfig:
             masked_key = cloud.license_key[:8] + "..." if len(cloud.license_key) > 8 else "***"
             logger.info(f"License Key: {masked_key}")
 
-    return AppConfig(
-        accounts=accounts,
-        global_config=global_config,
-        cloud=cloud,
-    )
+    return config
 
 
 def save_config(config: AppConfig, config_file: Path = None):
@@ -307,8 +310,12 @@ def save_config(config: AppConfig, config_file: Path = None):
         },
     }
 
-    with open(config_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        # C 序列化 + 单次写入 (orjson 原生 UTF-8，无需 ensure_ascii)
+        Path(config_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
 
 
 # 全局配置实例 (延迟加载)
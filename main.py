@@ -10,8 +10,11 @@ import sys
 import asyncio
 import logging
 import signal
+import contextvars
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+
+import httpx
 
 # 添加项目根目录到 path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -19,11 +22,21 @@ sys.path.insert(0, str(Path(__file__).parent))
 from config.settings import load_config, get_config
 from strategies.delta_neutral import DeltaNeutralStrategy
 
-# 云端模块
-from cloud.client import CloudClient, CloudConfig
-from cloud.license_manager import LicenseManager
-from cloud.data_reporter import DataReporter
-from cloud.config_sync import ConfigSync
+# 云端模块按需导入 (--status / 本地模式不付云端栈的导入开销)
+if TYPE_CHECKING:
+    from cloud.client import CloudClient
+    from cloud.license_manager import LicenseManager
+    from cloud.data_reporter import DataReporter
+    from cloud.config_sync import ConfigSync
+    from cloud.scheduler import CloudScheduler
+
+# uvloop: Linux/macOS 上显著更快的事件循环实现 (可选依赖)
+uvloop = None
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        pass
 
 # 配置日志
 logging.basicConfig(
@@ -46,7 +59,13 @@ class HedgeBot:
         self.license_manager: Optional[LicenseManager] = None
         self.data_reporter: Optional[DataReporter] = None
         self.config_sync: Optional[ConfigSync] = None
+        self.cloud_scheduler: Optional[CloudScheduler] = None
         self.cloud_enabled = False
+        # 所有账户的云端客户端共享的连接池
+        self._http_session: Optional[httpx.AsyncClient] = None
+        # 全部上报器共享的出站并发闸
+        self._api_sem = asyncio.Semaphore(8)
+        self._signals_installed = False
 
     async def initialize(self):
         """初始化机器人"""
@@ -61,15 +80,23 @@ class HedgeBot:
         if config.cloud.enabled:
             logger.info("云端功能已启用，正在初始化...")
             
+            from cloud.client import CloudClient, CloudConfig
+            from cloud.license_manager import LicenseManager
+            from cloud.data_reporter import DataReporter
+            from cloud.config_sync import ConfigSync
+            
             cloud_config = CloudConfig(
                 enabled=config.cloud.enabled,
                 api_url=config.cloud.api_url,
+                api_url_fallback=config.cloud.api_url_fallback,
                 license_key=config.cloud.license_key,
                 report_interval=config.cloud.report_interval,
                 timeout=config.cloud.timeout,
             )
             
-            self.cloud_client = CloudClient(cloud_config)
+            # 共享连接池: 全部账户的云端请求在同一组 keep-alive 连接上多路复用
+            self._http_session = CloudClient.build_session(cloud_config)
+            self.cloud_client = CloudClient(cloud_config, session=self._http_session)
             self.license_manager = LicenseManager(self.cloud_client)
             
             # 验证 License
@@ -89,6 +116,7 @@ class HedgeBot:
             self.data_reporter = DataReporter(
                 self.cloud_client,
                 report_interval=config.cloud.report_interval,
+                semaphore=self._api_sem,
             )
             
             # 初始化配置同步器
@@ -141,33 +169,23 @@ class HedgeBot:
         
         logger.info(f"将运行 {len(enabled_accounts)} 个账户")
 
-        # 4. 为每个账户创建策略（每个账户独立的云端客户端）
+        # 4. 为每个账户创建策略（共享云端客户端，账户上下文随调用传递）
         for account in enabled_accounts:
-            # 为每个账户创建独立的 CloudClient（包含账户名，用于服务端限制）
-            account_cloud_client = None
             account_data_reporter = None
             
             if self.cloud_enabled:
-                account_cloud_client = CloudClient(
-                    CloudConfig(
-                        enabled=config.cloud.enabled,
-                        api_url=config.cloud.api_url,
-                        license_key=config.cloud.license_key,
-                        report_interval=config.cloud.report_interval,
-                        timeout=config.cloud.timeout,
-                    ),
-                    account_name=account.name,  # 传入账户名（服务端限制关键）
-                )
                 account_data_reporter = DataReporter(
-                    account_cloud_client,
+                    self.cloud_client,
                     report_interval=config.cloud.report_interval,
+                    account_name=account.name,  # 账户名随每次上报传递（服务端限制关键）
+                    semaphore=self._api_sem,
                 )
-                logger.info(f"账户 [{account.name}] 云端客户端已创建")
+                logger.info(f"账户 [{account.name}] 数据上报器已创建")
             
             strategy = DeltaNeutralStrategy(
                 account_config=account,
                 global_config=config.global_config,
-                cloud_client=account_cloud_client or self.cloud_client,
+                cloud_client=self.cloud_client,
                 data_reporter=account_data_reporter or self.data_reporter,
             )
             await strategy.initialize()
@@ -178,6 +196,14 @@ class HedgeBot:
         logger.info("=" * 60)
         return True
 
+    def _install_signal_handlers(self, loop: asyncio.AbstractEventLoop):
+        """安装退出信号处理 (只装一次，重复 run 不叠加)"""
+        if self._signals_installed:
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+        self._signals_installed = True
+
     def _on_config_change(self, new_config: dict):
         """配置变更回调"""
         logger.info("检测到云端配置变更，更新策略参数...")
@@ -192,51 +218,83 @@ class HedgeBot:
 
         self.is_running = True
 
-        # 设置信号处理
-        loop = asyncio.get_event_loop()
-        for sig in (signal.SIGINT, signal.SIGTERM):
-            loop.add_signal_handler(sig, self.stop)
+        self._install_signal_handlers(asyncio.get_running_loop())
 
         logger.info("机器人开始运行...")
 
-        # 创建任务列表
-        tasks = []
-        
-        # 策略运行任务
-        for strategy in self.strategies:
-            tasks.append(asyncio.create_task(strategy.run_loop()))
-        
-        # 云端后台任务
+        # 云端后台任务 (统一注册到单个调度循环)
         if self.cloud_enabled:
+            from cloud.scheduler import CloudScheduler
+            self.cloud_scheduler = CloudScheduler()
             if self.license_manager:
-                await self.license_manager.start_background_check()
-            # 启动每个策略的 data_reporter 后台任务
-            for strategy in self.strategies:
-                if strategy.data_reporter:
-                    await strategy.data_reporter.start_background_report()
+                await self.license_manager.start_background_check(self.cloud_scheduler)
+            # 全部账户的周期上报合并为单个批量任务 (N 次 POST → 1 次)
+            if self.data_reporter:
+                self.cloud_scheduler.add_job(
+                    self._report_all_accounts,
+                    self.data_reporter.report_interval,
+                    name="report_batch",
+                    initial_delay=30,
+                )
             if self.config_sync:
-                await self.config_sync.start_background_sync()
+                await self.config_sync.start_background_sync(self.cloud_scheduler)
+            await self.cloud_scheduler.start()
 
         try:
-            await asyncio.gather(*tasks)
+            # TaskGroup: 结构化并发，任一策略异常时统一取消其余任务
+            # 空 Context 启动: 策略循环不依赖 contextvars，省掉每个任务的 copy_context
+            async with asyncio.TaskGroup() as tg:
+                for strategy in self.strategies:
+                    tg.create_task(strategy.run_loop(), context=contextvars.Context())
         except asyncio.CancelledError:
             logger.info("任务被取消")
         finally:
             # 停止云端任务
             await self._stop_cloud_tasks()
 
+    def _account_reporters(self) -> list[DataReporter]:
+        """全部策略的数据上报器 (去重，共享回退实例只出现一次)"""
+        return list(dict.fromkeys(
+            strategy.data_reporter
+            for strategy in self.strategies
+            if strategy.data_reporter
+        ))
+
+    async def _report_all_accounts(self) -> bool:
+        """集中式上报 tick: 汇总所有账户的待上报分节，单次批量 POST"""
+        accounts = []
+        reporters = []
+        for reporter in self._account_reporters():
+            payload = reporter.build_payload()
+            if payload is not None:
+                accounts.append({"account_name": reporter.account_name, **payload})
+                reporters.append(reporter)
+
+        if not accounts:
+            return True
+
+        async with self._api_sem:
+            success = await self.cloud_client.report_batch(accounts)
+        if success:
+            for reporter in reporters:
+                reporter.commit_payload()
+        return success
+
     async def _stop_cloud_tasks(self):
         """停止云端后台任务"""
+        if self.cloud_scheduler:
+            await self.cloud_scheduler.stop()
         if self.license_manager:
             await self.license_manager.stop_background_check()
-        # 停止每个策略的 data_reporter 后台任务
-        for strategy in self.strategies:
-            if strategy.data_reporter:
-                await strategy.data_reporter.stop_background_report()
+        # 终次冲刷每个账户的待上报数据
+        for reporter in self._account_reporters():
+            await reporter.stop_background_report()
         if self.config_sync:
             await self.config_sync.stop_background_sync()
         if self.cloud_client:
             await self.cloud_client.close()
+        if self._http_session and not self._http_session.is_closed:
+            await self._http_session.aclose()
 
     def stop(self):
         """停止机器人"""
@@ -289,9 +347,15 @@ async def test_cloud_connection():
         logger.error("云端功能未启用，请在配置文件中设置 cloud.enabled = true")
         return
     
+    from cloud.client import CloudClient, CloudConfig
+    from cloud.license_manager import LicenseManager
+    from cloud.data_reporter import DataReporter
+    from cloud.config_sync import ConfigSync
+    
     cloud_config = CloudConfig(
         enabled=config.cloud.enabled,
         api_url=config.cloud.api_url,
+        api_url_fallback=config.cloud.api_url_fallback,
         license_key=config.cloud.license_key,
         timeout=config.cloud.timeout,
     )
@@ -398,9 +462,13 @@ async def main():
         return
 
     if args.status:
-        import json
         status = await bot.get_status()
-        print(json.dumps(status, indent=2, ensure_ascii=False))
+        try:
+            import orjson
+            print(orjson.dumps(status, option=orjson.OPT_INDENT_2).decode())
+        except ImportError:
+            import json
+            print(json.dumps(status, indent=2, ensure_ascii=False))
     elif args.once:
         await bot.run_once()
     else:
@@ -408,4 +476,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        # uvloop.run 替代 install() + asyncio.run (install 在 3.12 起不推荐)
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -9,16 +9,95 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import Optional
-from dataclasses import dataclass
-import pandas as pd
+from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass, fields
+import numpy as np
+
+if TYPE_CHECKING:  # pandas 仅用于类型标注，运行期按需导入
+    import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # 可选依赖，未安装时回退 NumPy 归约
+    njit = None
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _pnl_kernel(eq):
+        """单循环求 start/end/high/low (JIT 融合四次归约为一遍扫描)"""
+        high = eq[0]
+        low = eq[0]
+        for i in range(eq.shape[0]):
+            v = eq[i]
+            if v > high:
+                high = v
+            if v < low:
+                low = v
+        return eq[0], eq[eq.shape[0] - 1], high, low
+else:
+    def _pnl_kernel(eq):
+        """NumPy 回退: 与 JIT 内核同构的 start/end/high/low 归约"""
+        return float(eq[0]), float(eq[-1]), float(eq.max()), float(eq.min())
+
+
+class EquityHistory:
+    """定长 NumPy 环形缓冲的净值历史
+
+    追加式 (timestamp_ns:i8, equity:f8) 时间序列，窗口查询走纯
+    searchsorted + 切片，不经过 pandas；容量写满后丢弃最旧的一半，
+    内存随运行时长保持有界
+    """
+
+    __slots__ = ("ts", "eq", "n", "capacity")
+
+    def __init__(self, capacity: int = 200_000):
+        self.capacity = capacity
+        self.ts = np.empty(capacity, dtype="i8")
+        self.eq = np.empty(capacity, dtype="f8")
+        self.n = 0
+
+    def append(self, ts_ns: int, equity: float):
+        """追加一条快照 (写满时前移后半段，摊还 O(1))"""
+        if self.n >= self.capacity:
+            keep = self.capacity // 2
+            self.ts[:keep] = self.ts[self.capacity - keep:]
+            self.eq[:keep] = self.eq[self.capacity - keep:]
+            self.n = keep
+        self.ts[self.n] = ts_ns
+        self.eq[self.n] = equity
+        self.n += 1
+
+
+@dataclass(slots=True, frozen=True)
+class CurrentSnapshot:
+    """当前快照 (定型字段取代逐键 dict 查找，可跨 tick 复用)"""
+    equity: float = 0.0
+    jlp_amount: float = 0.0
+    jlp_price: float = 0.0
+    jlp_value: float = 0.0
+    available_balance: float = 0.0
+    unrealized_pnl: float = 0.0
+    margin_ratio: float = 0.0
+    hedge_ratio: float = 0.0
+    sol_pos: float = 0.0
+    eth_pos: float = 0.0
+    btc_pos: float = 0.0
+    sol_funding: float = 0.0
+    eth_funding: float = 0.0
+    btc_funding: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CurrentSnapshot":
+        """兼容旧 dict 快照的转换入口"""
+        return cls(**{f.name: float(data.get(f.name, 0)) for f in fields(cls)})
+
+
+@dataclass(slots=True, frozen=True)
 class PnLMetrics:
-    """盈亏指标"""
+    """盈亏指标 (slots 实例免 __dict__，每 tick 多次分配时更省)"""
     pnl: float              # 绝对盈亏
     pnl_pct: float          # 盈亏百分比
     start_equity: float     # 起始权益
@@ -27,7 +106,7 @@ class PnLMetrics:
     low_equity: float       # 最低权益
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReportMetrics:
     """报告指标汇总"""
     # 当前状态
@@ -68,24 +147,45 @@ class EquityCalculator:
 
     def __init__(self):
         """初始化计算器"""
-        pass
+        # calc_report_metrics 备忘: 历史尾部 + 当前净值 + 日期未变时直接复用
+        self._last_key: Optional[tuple] = None
+        self._last_metrics: Optional["ReportMetrics"] = None
+
+    @staticmethod
+    def _extract_series(df):
+        """统一提取 (ts, eq) ndarray 对
+
+        EquityHistory 走零拷贝切片视图，DataFrame 走单次列转换；
+        空历史返回 (None, None)
+        """
+        if isinstance(df, EquityHistory):
+            if df.n == 0:
+                return None, None
+            return df.ts[:df.n].view('datetime64[ns]'), df.eq[:df.n]
+        if df.empty:
+            return None, None
+        return (
+            df['timestamp'].to_numpy(dtype='datetime64[ns]'),
+            df['equity'].to_numpy(dtype=np.float64),
+        )
 
     def calc_pnl(
         self,
-        df: pd.DataFrame,
+        df,
         start_equity: Optional[float] = None,
     ) -> PnLMetrics:
         """
         计算盈亏指标
 
         Args:
-            df: 历史数据 DataFrame
+            df: 历史数据 (EquityHistory 环形缓冲或 pd.DataFrame)
             start_equity: 起始权益（可选，默认使用第一条数据）
 
         Returns:
             PnLMetrics: 盈亏指标
         """
-        if df.empty:
+        _, eq = self._extract_series(df)
+        if eq is None:
             return PnLMetrics(
                 pnl=0, pnl_pct=0,
                 start_equity=start_equity or 0,
@@ -94,10 +194,9 @@ class EquityCalculator:
                 low_equity=start_equity or 0,
             )
 
-        start = start_equity if start_equity is not None else float(df.iloc[0]['equity'])
-        end = float(df.iloc[-1]['equity'])
-        high = float(df['equity'].max())
-        low = float(df['equity'].min())
+        first, end, high, low = _pnl_kernel(eq)
+        start = start_equity if start_equity is not None else float(first)
+        end, high, low = float(end), float(high), float(low)
 
         pnl = end - start
         pnl_pct = pnl / start if start > 0 else 0
@@ -111,28 +210,29 @@ class EquityCalculator:
             low_equity=low,
         )
 
-    def calc_today_pnl(self, df: pd.DataFrame) -> PnLMetrics:
-        """计算今日盈亏"""
-        today = datetime.now().date()
-        today_df = df[df['timestamp'].dt.date == today]
-        return self.calc_pnl(today_df)
-
-    def calc_week_pnl(self, df: pd.DataFrame) -> PnLMetrics:
-        """计算本周盈亏（从周一开始）"""
-        today = datetime.now()
-        monday = today - timedelta(days=today.weekday())
-        monday = monday.replace(hour=0, minute=0, second=0, microsecond=0)
+    def _pnl_from_slice(self, eq: np.ndarray, start_idx: int) -> PnLMetrics:
+        """对 equity 数组的 [start_idx:] 连续切片做向量化归约"""
+        if start_idx >= eq.shape[0]:
+            return PnLMetrics(
+                pnl=0, pnl_pct=0,
+                start_equity=0, end_equity=0,
+                high_equity=0, low_equity=0,
+            )
 
-        week_df = df[df['timestamp'] >= monday]
-        return self.calc_pnl(week_df)
+        start, end, high, low = _pnl_kernel(eq[start_idx:])
+        start, end, high, low = float(start), float(end), float(high), float(low)
 
-    def calc_month_pnl(self, df: pd.DataFrame) -> PnLMetrics:
-        """计算本月盈亏"""
-        today = datetime.now()
-        month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        pnl = end - start
+        pnl_pct = pnl / start if start > 0 else 0
 
-        month_df = df[df['timestamp'] >= month_start]
-        return self.calc_pnl(month_df)
+        return PnLMetrics(
+            pnl=pnl,
+            pnl_pct=pnl_pct,
+            start_equity=start,
+            end_equity=end,
+            high_equity=high,
+            low_equity=low,
+        )
 
     def calc_total_pnl(self, current_equity: float, jlp_value: float) -> PnLMetrics:
         """
@@ -153,18 +253,28 @@ class EquityCalculator:
             low_equity=current_equity,
         )
 
-    def calc_running_days(self, df: pd.DataFrame) -> int:
+    def calc_running_days(self, df, now: Optional[datetime] = None) -> int:
         """
         计算运行天数（从首条历史数据开始）
+
+        Args:
+            df: 历史数据 (EquityHistory 环形缓冲或 pd.DataFrame)
+            now: 统一的当前时间（可选，默认取 datetime.now()）
         """
-        if df.empty:
+        ts, _ = self._extract_series(df)
+        if ts is None:
             return 0
 
-        first_timestamp = df.iloc[0]['timestamp']
-        if isinstance(first_timestamp, str):
-            first_timestamp = pd.to_datetime(first_timestamp)
+        if now is None:
+            now = datetime.now()
 
-        return (datetime.now() - first_timestamp).days
+        return self._running_days_from_ts(ts, now)
+
+    @staticmethod
+    def _running_days_from_ts(ts: np.ndarray, now: datetime) -> int:
+        """从 datetime64[ns] 时间戳数组的首元素算运行天数"""
+        first_timestamp = ts[0].astype('datetime64[ms]').astype(datetime)
+        return (now - first_timestamp).days
 
     def calc_annualized_return(self, cumulative_pct: float, running_days: int) -> float:
         """
@@ -185,52 +295,77 @@ class EquityCalculator:
 
     def calc_report_metrics(
         self,
-        df: pd.DataFrame,
-        current_snapshot: dict,
+        df,
+        current_snapshot: CurrentSnapshot,
     ) -> ReportMetrics:
         """
         计算完整的报告指标
 
         Args:
-            df: 历史数据
-            current_snapshot: 当前快照
+            df: 历史数据 (EquityHistory 环形缓冲或 pd.DataFrame)
+            current_snapshot: 当前快照 (dict 入参自动转换)
 
         Returns:
             ReportMetrics: 报告指标
         """
-        current_equity = float(current_snapshot.get('equity', 0))
-        jlp_value = float(current_snapshot.get('jlp_value', 0))
-        jlp_price = float(current_snapshot.get('jlp_price', 0))
+        if isinstance(current_snapshot, dict):
+            current_snapshot = CurrentSnapshot.from_dict(current_snapshot)
+        snap = current_snapshot
+        # 单次取当前时间，备忘键与各窗口边界共用同一时刻
+        now = datetime.now()
+
+        # 时间戳/净值列只提取一次，备忘键与窗口二分共用同一对 ndarray
+        ts, eq = self._extract_series(df)
+
+        key = (
+            ts.shape[0] if ts is not None else 0,
+            int(ts[-1].astype('i8')) if ts is not None else 0,
+            round(snap.equity, 6),
+            now.date().toordinal(),  # 跨日自动失效
+        )
+        if key == self._last_key and self._last_metrics is not None:
+            return self._last_metrics
 
-        # 计算各周期盈亏
-        today_pnl = self.calc_today_pnl(df)
-        week_pnl = self.calc_week_pnl(df)
-        month_pnl = self.calc_month_pnl(df)
+        current_equity = snap.equity
+        jlp_value = snap.jlp_value
+        jlp_price = snap.jlp_price
+
+        # 计算各周期盈亏: 三个窗口起点用 searchsorted 二分定位
+        if ts is None:
+            today_pnl = week_pnl = month_pnl = self.calc_pnl(df)
+        else:
+            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            monday = today_start - timedelta(days=now.weekday())
+            month_start = today_start.replace(day=1)
+
+            today_pnl = self._pnl_from_slice(eq, int(np.searchsorted(ts, np.datetime64(today_start))))
+            week_pnl = self._pnl_from_slice(eq, int(np.searchsorted(ts, np.datetime64(monday))))
+            month_pnl = self._pnl_from_slice(eq, int(np.searchsorted(ts, np.datetime64(month_start))))
 
         # 累计盈亏 = 账户净值 - JLP价值（本金）
         total_pnl = self.calc_total_pnl(current_equity, jlp_value)
 
-        # 运行天数
-        running_days = self.calc_running_days(df)
+        # 运行天数（直接从已提取的时间戳数组取首元素，不回头走 pandas）
+        running_days = self._running_days_from_ts(ts, now) if ts is not None else 0
 
         # 年化收益率
         annualized = self.calc_annualized_return(total_pnl.pnl_pct, running_days)
 
-        return ReportMetrics(
+        metrics = ReportMetrics(
             current_equity=current_equity,
-            jlp_amount=float(current_snapshot.get('jlp_amount', 0)),
+            jlp_amount=snap.jlp_amount,
             jlp_price=jlp_price,
             jlp_value=jlp_value,
-            available_balance=float(current_snapshot.get('available_balance', 0)),
-            unrealized_pnl=float(current_snapshot.get('unrealized_pnl', 0)),
-            margin_ratio=float(current_snapshot.get('margin_ratio', 0)),
-            hedge_ratio=float(current_snapshot.get('hedge_ratio', 0)),
-            sol_pos=float(current_snapshot.get('sol_pos', 0)),
-            eth_pos=float(current_snapshot.get('eth_pos', 0)),
-            btc_pos=float(current_snapshot.get('btc_pos', 0)),
-            sol_funding=float(current_snapshot.get('sol_funding', 0)),
-            eth_funding=float(current_snapshot.get('eth_funding', 0)),
-            btc_funding=float(current_snapshot.get('btc_funding', 0)),
+            available_balance=snap.available_balance,
+            unrealized_pnl=snap.unrealized_pnl,
+            margin_ratio=snap.margin_ratio,
+            hedge_ratio=snap.hedge_ratio,
+            sol_pos=snap.sol_pos,
+            eth_pos=snap.eth_pos,
+            btc_pos=snap.btc_pos,
+            sol_funding=snap.sol_funding,
+            eth_funding=snap.eth_funding,
+            btc_funding=snap.btc_funding,
             today_pnl=today_pnl,
             week_pnl=week_pnl,
             month_pnl=month_pnl,
@@ -238,3 +373,7 @@ class EquityCalculator:
             annualized_return=annualized,
             running_days=running_days,
         )
+
+        self._last_key = key
+        self._last_metrics = metrics
+        return metrics
@@ -5,20 +5,60 @@ Generate equity charts with dual Y-axis and drawdown
 """
 
 import io
+import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib as mpl
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import FuncFormatter
+from PIL import Image
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency, NumPy fallback below
+    njit = None
 
 # Use default font (no Chinese)
-plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial']
-plt.rcParams['axes.unicode_minus'] = False
+mpl.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial']
+mpl.rcParams['axes.unicode_minus'] = False
 
 logger = logging.getLogger(__name__)
 
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _dd_kernel(eq):
+        """Fused single-pass drawdown: cummax, percentage and argmin in one loop"""
+        n = eq.shape[0]
+        out = np.empty(n)
+        m = eq[0]
+        min_v = 0.0
+        min_i = 0
+        for i in range(n):
+            if eq[i] > m:
+                m = eq[i]
+            d = (eq[i] - m) / m * 100.0
+            out[i] = d
+            if d < min_v:
+                min_v = d
+                min_i = i
+        return out, min_v, min_i
+else:
+    def _dd_kernel(eq):
+        """NumPy fallback: same contract as the JIT kernel"""
+        roll_max = np.maximum.accumulate(eq)
+        out = (eq - roll_max) / roll_max * 100.0
+        i = int(out.argmin())
+        return out, float(out[i]), i
+
 # Charts directory
 CHARTS_DIR = Path(__file__).parent.parent.parent / "data" / "charts"
 
@@ -48,6 +88,10 @@ class ChartGenerator:
         self.charts_dir = charts_dir or CHARTS_DIR
         self.charts_dir.mkdir(parents=True, exist_ok=True)
 
+        # Reusable figure/buffer state, one set per rendering thread so
+        # save_charts can fan the three period charts out to a pool
+        self._local = threading.local()
+
         # Try to use seaborn for styling
         try:
             import seaborn as sns
@@ -57,33 +101,26 @@ class ChartGenerator:
             self.use_seaborn = False
             logger.warning("seaborn not installed, using default style")
 
-    def _calculate_returns(self, df: pd.DataFrame) -> pd.Series:
-        """Calculate cumulative returns from first value"""
-        first_equity = df['equity'].iloc[0]
-        returns = (df['equity'] - first_equity) / first_equity * 100
-        return returns
+    def _calculate_returns(self, eq: np.ndarray) -> np.ndarray:
+        """Calculate cumulative returns from first value (vectorized)"""
+        return (eq - eq[0]) / eq[0] * 100.0
 
-    def _calculate_drawdown(self, df: pd.DataFrame) -> Tuple[pd.Series, float, int]:
+    def _calculate_drawdown(self, eq: np.ndarray) -> Tuple[np.ndarray, float, int]:
         """
-        Calculate drawdown series
+        Calculate drawdown series (fused single-pass kernel)
 
         Returns:
-            Tuple[drawdown_series, max_drawdown, max_dd_idx]
+            Tuple[drawdown_pct, max_drawdown, max_dd_pos (positional index)]
         """
-        equity = df['equity']
-        rolling_max = equity.expanding().max()
-        drawdown = (equity - rolling_max) / rolling_max * 100
-
-        max_dd = drawdown.min()
-        max_dd_idx = drawdown.idxmin()
-
-        return drawdown, max_dd, max_dd_idx
+        drawdown, max_dd, pos = _dd_kernel(eq)
+        return drawdown, float(max_dd), int(pos)
 
     def generate_equity_chart(
         self,
         df: pd.DataFrame,
         period_name: str,
         account: str,
+        now_str: Optional[str] = None,
     ) -> bytes:
         """
         Generate equity chart with 3 separate subplots
@@ -92,27 +129,39 @@ class ChartGenerator:
             df: Historical data DataFrame
             period_name: Period name (7D/30D/365D)
             account: Account name
+            now_str: Preformatted title timestamp (computed here if omitted)
 
         Returns:
             bytes: PNG image data
         """
         if df.empty or len(df) < 2:
-            return self._generate_empty_chart(period_name, account)
+            return self._generate_empty_chart(period_name, account, now_str)
+
+        df = self._decimate(df)
 
-        # Create figure with 3 subplots
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), height_ratios=[1.2, 1, 1])
-        fig.patch.set_facecolor(self.COLORS['background'])
+        st = self._figure_state()
+        fig, (ax1, ax2, ax3) = st.fig, st.axes
+        for ax in (ax1, ax2, ax3):
+            ax.cla()
+            # cla() resets tick artists; reattach the cached ones
+            loc, fmt = st.date_artists[ax]
+            ax.xaxis.set_major_locator(loc)
+            ax.xaxis.set_major_formatter(fmt)
 
-        # Ensure timestamp is datetime type
+        # Ensure timestamp is datetime type (non-mutating: df may be a view)
         if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
 
-        # Calculate metrics
-        returns = self._calculate_returns(df)
-        drawdown, max_dd, max_dd_idx = self._calculate_drawdown(df)
+        # Convert once: float date numbers + equity ndarray for all panels
+        ts_x = mdates.date2num(df['timestamp'].to_numpy(dtype='datetime64[ns]'))
+        eq_arr = df['equity'].to_numpy(dtype=np.float64)
+
+        # Calculate metrics off the shared equity array (converted once above)
+        returns = self._calculate_returns(eq_arr)
+        drawdown, max_dd, max_dd_pos = self._calculate_drawdown(eq_arr)
 
         # Title
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        now = now_str or datetime.now().strftime("%Y-%m-%d %H:%M")
         fig.suptitle(
             f'JLP Neutral Arbitrage - {period_name}\n{account} | {now}',
             fontsize=14,
@@ -125,32 +174,34 @@ class ChartGenerator:
         ax1.set_facecolor(self.COLORS['background'])
 
         ax1.plot(
-            df['timestamp'],
-            df['equity'],
+            ts_x,
+            eq_arr,
             color=self.COLORS['equity_line'],
             linewidth=2,
             label='Equity',
             marker='o' if len(df) <= 14 else None,
             markersize=4,
+            rasterized=True,
         )
         ax1.fill_between(
-            df['timestamp'],
-            df['equity'],
+            ts_x,
+            eq_arr,
             alpha=0.15,
             color=self.COLORS['equity_line'],
+            rasterized=True,
         )
 
         ax1.set_ylabel('Equity ($)', fontsize=11, color=self.COLORS['equity_line'])
         ax1.tick_params(axis='y', labelcolor=self.COLORS['equity_line'])
-        ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax1.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
 
         # Add high/low annotations
-        max_idx = df['equity'].idxmax()
-        min_idx = df['equity'].idxmin()
+        max_pos = int(eq_arr.argmax())
+        min_pos = int(eq_arr.argmin())
 
         ax1.annotate(
-            f'High: ${df.loc[max_idx, "equity"]:,.0f}',
-            xy=(df.loc[max_idx, 'timestamp'], df.loc[max_idx, 'equity']),
+            f'High: ${eq_arr[max_pos]:,.0f}',
+            xy=(ts_x[max_pos], eq_arr[max_pos]),
             xytext=(10, 5),
             textcoords='offset points',
             fontsize=9,
@@ -159,8 +210,8 @@ class ChartGenerator:
         )
 
         ax1.annotate(
-            f'Low: ${df.loc[min_idx, "equity"]:,.0f}',
-            xy=(df.loc[min_idx, 'timestamp'], df.loc[min_idx, 'equity']),
+            f'Low: ${eq_arr[min_pos]:,.0f}',
+            xy=(ts_x[min_pos], eq_arr[min_pos]),
             xytext=(10, -12),
             textcoords='offset points',
             fontsize=9,
@@ -176,41 +227,44 @@ class ChartGenerator:
         ax2.set_facecolor(self.COLORS['background'])
 
         ax2.plot(
-            df['timestamp'],
+            ts_x,
             returns,
             color=self.COLORS['return_line'],
             linewidth=2,
             label='Return %',
+            rasterized=True,
         )
         ax2.fill_between(
-            df['timestamp'],
+            ts_x,
             returns,
             0,
             where=(returns >= 0),
             alpha=0.2,
             color=self.COLORS['return_line'],
             interpolate=True,
+            rasterized=True,
         )
         ax2.fill_between(
-            df['timestamp'],
+            ts_x,
             returns,
             0,
             where=(returns < 0),
             alpha=0.2,
             color=self.COLORS['drawdown_fill'],
             interpolate=True,
+            rasterized=True,
         )
 
         ax2.axhline(y=0, color=self.COLORS['zero_line'], linestyle='-', linewidth=1, alpha=0.7)
         ax2.set_ylabel('Return (%)', fontsize=11, color=self.COLORS['return_line'])
         ax2.tick_params(axis='y', labelcolor=self.COLORS['return_line'])
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:+.2f}%'))
+        ax2.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{x:+.2f}%'))
 
         # Annotate current return
-        current_return = returns.iloc[-1]
+        current_return = returns[-1]
         ax2.annotate(
             f'Current: {current_return:+.2f}%',
-            xy=(df['timestamp'].iloc[-1], current_return),
+            xy=(ts_x[-1], current_return),
             xytext=(-60, 10 if current_return >= 0 else -15),
             textcoords='offset points',
             fontsize=9,
@@ -226,28 +280,30 @@ class ChartGenerator:
         ax3.set_facecolor(self.COLORS['background'])
 
         ax3.fill_between(
-            df['timestamp'],
+            ts_x,
             drawdown,
             0,
             color=self.COLORS['drawdown_fill'],
             alpha=0.4,
             label='Drawdown',
+            rasterized=True,
         )
         ax3.plot(
-            df['timestamp'],
+            ts_x,
             drawdown,
             color=self.COLORS['drawdown_fill'],
             linewidth=1.5,
+            rasterized=True,
         )
 
         ax3.axhline(y=0, color=self.COLORS['zero_line'], linestyle='-', linewidth=1)
         ax3.set_ylabel('Drawdown (%)', fontsize=11, color=self.COLORS['drawdown_fill'])
         ax3.tick_params(axis='y', labelcolor=self.COLORS['drawdown_fill'])
-        ax3.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.2f}%'))
+        ax3.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{x:.2f}%'))
 
         # Annotate max drawdown
         if max_dd < 0:
-            max_dd_time = df.loc[max_dd_idx, 'timestamp']
+            max_dd_time = ts_x[max_dd_pos]
             ax3.annotate(
                 f'Max DD: {max_dd:.2f}%',
                 xy=(max_dd_time, max_dd),
@@ -269,42 +325,79 @@ class ChartGenerator:
             ax.spines['right'].set_visible(False)
 
         # ========== Bottom Summary ==========
-        start_equity = float(df.iloc[0]['equity'])
-        end_equity = float(df.iloc[-1]['equity'])
+        start_equity = float(eq_arr[0])
+        end_equity = float(eq_arr[-1])
         period_pnl = end_equity - start_equity
         period_pnl_pct = period_pnl / start_equity * 100 if start_equity > 0 else 0
 
         summary_text = (
             f"Return: ${period_pnl:+,.0f} ({period_pnl_pct:+.2f}%)  |  "
-            f"High: ${df['equity'].max():,.0f}  |  "
-            f"Low: ${df['equity'].min():,.0f}  |  "
+            f"High: ${eq_arr[max_pos]:,.0f}  |  "
+            f"Low: ${eq_arr[min_pos]:,.0f}  |  "
             f"Max DD: {max_dd:.2f}%"
         )
 
-        fig.text(
-            0.5, 0.01,
-            summary_text,
-            ha='center',
-            fontsize=11,
-            color=self.COLORS['text'],
-            bbox=dict(boxstyle='round', facecolor='#F5F5F5', edgecolor='#E0E0E0'),
-        )
+        if st.summary_text is None:
+            st.summary_text = fig.text(
+                0.5, 0.01,
+                summary_text,
+                ha='center',
+                fontsize=11,
+                color=self.COLORS['text'],
+                bbox=dict(boxstyle='round', facecolor='#F5F5F5', edgecolor='#E0E0E0'),
+            )
+        else:
+            st.summary_text.set_text(summary_text)
 
         # Adjust layout
-        plt.tight_layout()
-        plt.subplots_adjust(top=0.92, bottom=0.06, hspace=0.30)
+        fig.tight_layout()
+        fig.subplots_adjust(top=0.92, bottom=0.06, hspace=0.30)
 
-        # Save to bytes
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close(fig)
+        # Encode to PNG (figure stays alive for the next call)
+        return self._encode_png(fig)
 
+    def _encode_png(self, fig) -> bytes:
+        """Render the figure once and encode via Pillow
+
+        Skips bbox_inches='tight' (which pre-renders a second time just to
+        measure the bbox); layout is already set by tight_layout above.
+        Deflate level 1 encodes ~5x faster than the default for chart-like
+        images at similar size. Output goes through this thread's buffer.
+        """
+        fig.canvas.draw()
+        w, h = fig.canvas.get_width_height()
+        img = np.frombuffer(fig.canvas.buffer_rgba(), dtype=np.uint8).reshape(h, w, 4)
+        buf = self._figure_state().png_buf
+        buf.seek(0)
+        buf.truncate()
+        Image.fromarray(img).save(buf, format='PNG', compress_level=1, optimize=False)
         return buf.getvalue()
 
-    def _generate_empty_chart(self, period_name: str, account: str) -> bytes:
+    def _figure_state(self):
+        """Lazily build this thread's cached figure, date artists and buffer"""
+        st = self._local
+        if getattr(st, 'fig', None) is None:
+            # OO API: no pyplot figure registry, safe off the main thread
+            st.fig = Figure(figsize=(12, 10))
+            FigureCanvasAgg(st.fig)
+            st.axes = st.fig.subplots(3, 1, height_ratios=[1.2, 1, 1])
+            st.fig.patch.set_facecolor(self.COLORS['background'])
+            st.summary_text = None
+            st.png_buf = io.BytesIO()
+            # One locator/formatter pair per axis, reused across renders
+            st.date_artists = {}
+            for ax in st.axes:
+                loc = mdates.AutoDateLocator(minticks=5, maxticks=10)
+                st.date_artists[ax] = (loc, mdates.ConciseDateFormatter(loc))
+        return st
+
+    def _generate_empty_chart(
+        self, period_name: str, account: str, now_str: Optional[str] = None
+    ) -> bytes:
         """Generate empty data chart"""
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
 
         ax.text(
             0.5, 0.5,
@@ -319,7 +412,7 @@ class ChartGenerator:
         ax.set_ylim(0, 1)
         ax.axis('off')
 
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        now = now_str or datetime.now().strftime("%Y-%m-%d %H:%M")
         fig.suptitle(
             f'JLP Neutral Arbitrage - {period_name}\n{account} | {now}',
             fontsize=14,
@@ -327,61 +420,87 @@ class ChartGenerator:
             color=self.COLORS['title'],
         )
 
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close(fig)
+        return self._encode_png(fig)
 
-        return buf.getvalue()
+    @staticmethod
+    def _decimate(df: pd.DataFrame, max_points: int = 2000) -> pd.DataFrame:
+        """Cap plotted samples via stride decimation
+
+        Line2D draw cost scales with point count; minute-sampled 7d data
+        brings ~10k points for no visual gain. The equity extremes and the
+        final sample are always kept so annotations and the summary stay
+        exact.
+        """
+        n = len(df)
+        step = n // max_points
+        if step <= 1:
+            return df
+        eq = df['equity'].to_numpy(dtype=np.float64)
+        keep = np.union1d(
+            np.arange(0, n, step),
+            np.array([int(eq.argmax()), int(eq.argmin()), n - 1]),
+        )
+        return df.iloc[keep]
+
+    @staticmethod
+    def _window(df: pd.DataFrame, days: int) -> pd.DataFrame:
+        """Trailing window over the monotonic timestamp column
+
+        Binary search + positional slice: no boolean mask, no column copies
+        """
+        if df.empty:
+            return df
+        ts = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+        cutoff = np.datetime64(datetime.now() - timedelta(days=days))
+        return df.iloc[int(np.searchsorted(ts, cutoff)):]
+
+    @staticmethod
+    def _daily_last(df: pd.DataFrame) -> pd.DataFrame:
+        """Keep the last row of each day (int64 day keys, no per-row date boxing)"""
+        ts_days = df['timestamp'].to_numpy(dtype='datetime64[D]')
+        # last row per day == first occurrence on the reversed array
+        _, first_rev = np.unique(ts_days[::-1], return_index=True)
+        last_idx = np.sort(len(ts_days) - 1 - first_rev)
+        return df.iloc[last_idx].assign(timestamp=ts_days[last_idx].astype('datetime64[ns]'))
 
     def generate_7d_chart(
         self,
         df: pd.DataFrame,
         account: str,
+        now_str: Optional[str] = None,
     ) -> bytes:
         """Generate 7-day chart"""
-        cutoff = datetime.now() - timedelta(days=7)
-        df_7d = df[df['timestamp'] >= cutoff].copy()
-
-        return self.generate_equity_chart(df_7d, "Last 7 Days", account)
+        return self.generate_equity_chart(self._window(df, 7), "Last 7 Days", account, now_str)
 
     def generate_30d_chart(
         self,
         df: pd.DataFrame,
         account: str,
+        now_str: Optional[str] = None,
     ) -> bytes:
         """Generate 30-day chart"""
-        cutoff = datetime.now() - timedelta(days=30)
-        df_30d = df[df['timestamp'] >= cutoff].copy()
+        df_30d = self._window(df, 30)
 
         # Aggregate by day (reduce data points)
         if not df_30d.empty:
-            df_30d['date'] = df_30d['timestamp'].dt.date
-            df_daily = df_30d.groupby('date').last().reset_index()
-            df_daily['timestamp'] = pd.to_datetime(df_daily['date'])
+            return self.generate_equity_chart(self._daily_last(df_30d), "Last 30 Days", account, now_str)
 
-            return self.generate_equity_chart(df_daily, "Last 30 Days", account)
-
-        return self.generate_equity_chart(df_30d, "Last 30 Days", account)
+        return self.generate_equity_chart(df_30d, "Last 30 Days", account, now_str)
 
     def generate_365d_chart(
         self,
         df: pd.DataFrame,
         account: str,
+        now_str: Optional[str] = None,
     ) -> bytes:
         """Generate 365-day chart"""
-        cutoff = datetime.now() - timedelta(days=365)
-        df_365d = df[df['timestamp'] >= cutoff].copy()
+        df_365d = self._window(df, 365)
 
         # Aggregate by day
         if not df_365d.empty:
-            df_365d['date'] = df_365d['timestamp'].dt.date
-            df_daily = df_365d.groupby('date').last().reset_index()
-            df_daily['timestamp'] = pd.to_datetime(df_daily['date'])
-
-            return self.generate_equity_chart(df_daily, "Last 365 Days", account)
+            return self.generate_equity_chart(self._daily_last(df_365d), "Last 365 Days", account, now_str)
 
-        return self.generate_equity_chart(df_365d, "Last 365 Days", account)
+        return self.generate_equity_chart(df_365d, "Last 365 Days", account, now_str)
 
     def save_charts(
         self,
@@ -398,28 +517,41 @@ class ChartGenerator:
         Returns:
             list: Saved file paths
         """
-        today = datetime.now().strftime("%Y-%m-%d")
+        # Format the clock once for all three charts and the filenames
+        now = datetime.now()
+        now_str = now.strftime("%Y-%m-%d %H:%M")
+        today = now.strftime("%Y-%m-%d")
         saved_files = []
 
-        # Generate 3 charts
+        # Generate the 3 period charts in parallel: each worker thread gets
+        # its own cached figure, and Agg/NumPy release the GIL while drawing
         charts = [
             ("7d", self.generate_7d_chart),
             ("30d", self.generate_30d_chart),
             ("365d", self.generate_365d_chart),
         ]
 
-        for period, generator in charts:
-            try:
-                chart_data = generator(df, account)
-                file_path = self.charts_dir / f"equity_{period}_{today}.png"
-
-                with open(file_path, 'wb') as f:
-                    f.write(chart_data)
-
-                saved_files.append(file_path)
-                logger.info(f"Chart saved: {file_path}")
-
-            except Exception as e:
-                logger.error(f"Failed to generate {period} chart: {e}")
+        with ThreadPoolExecutor(max_workers=len(charts)) as pool:
+            futures = [
+                (period, pool.submit(generator, df, account, now_str))
+                for period, generator in charts
+            ]
+            for period, future in futures:
+                try:
+                    chart_data = future.result()
+                    file_path = self.charts_dir / f"equity_{period}_{today}.png"
+
+                    # Write to a temp file and rename atomically so a reader
+                    # never sees a half-written PNG
+                    tmp_path = file_path.with_suffix('.png.tmp')
+                    with open(tmp_path, 'wb') as f:
+                        f.write(chart_data)
+                    os.replace(tmp_path, file_path)
+
+                    saved_files.append(file_path)
+                    logger.info(f"Chart saved: {file_path}")
+
+                except Exception as e:
+                    logger.error(f"Failed to generate {period} chart: {e}")
 
         return saved_files
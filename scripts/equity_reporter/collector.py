@@ -7,8 +7,10 @@
 from __future__ import annotations
 
 import json
+import random
 import asyncio
 import logging
+import httpx
 from typing import Optional
 from decimal import Decimal
 from dataclasses import dataclass
@@ -51,7 +53,10 @@ class EquityCollector:
 
     # 重试配置
     MAX_RETRIES = 3
-    RETRY_DELAY = 2  # 秒
+    RETRY_DELAY = 2  # 基础退避（秒），按次数指数放大并加抖动
+
+    # 类级并发闸: 多账户采集器不会同时打爆对冲 API
+    _hedge_sem = asyncio.Semaphore(4)
 
     def __init__(
         self,
@@ -70,6 +75,11 @@ class EquityCollector:
         self.client = asterdex_client
         self.account_name = account_name
         self.hedge_api_url = hedge_api_url
+        # 对冲 API 长连接客户端: 跨采集/重试复用连接，TLS 握手只做一次
+        self._http: Optional[httpx.AsyncClient] = None
+        # JLP 价格缓存的进程内备忘 (mtime 未变时免文件读取与解析)
+        self._jlp_cache: Optional[tuple[Decimal, Optional[str]]] = None
+        self._jlp_cache_mtime_ns = 0
 
     def _load_cached_jlp_price(self) -> tuple[Decimal, Optional[str]]:
         """
@@ -80,11 +90,16 @@ class EquityCollector:
         """
         try:
             if JLP_PRICE_CACHE_FILE.exists():
+                mtime_ns = JLP_PRICE_CACHE_FILE.stat().st_mtime_ns
+                if self._jlp_cache is not None and mtime_ns == self._jlp_cache_mtime_ns:
+                    return self._jlp_cache
                 with open(JLP_PRICE_CACHE_FILE, "r") as f:
                     data = json.load(f)
-                    price = Decimal(str(data.get("price", "0")))
-                    updated_at = data.get("updated_at")
-                    return price, updated_at
+                price = Decimal(str(data.get("price", "0")))
+                updated_at = data.get("updated_at")
+                self._jlp_cache = (price, updated_at)
+                self._jlp_cache_mtime_ns = mtime_ns
+                return price, updated_at
         except Exception as e:
             logger.warning(f"加载价格缓存失败: {e}")
         return Decimal("0"), None
@@ -93,16 +108,20 @@ class EquityCollector:
         """保存 JLP 价格到缓存"""
         try:
             CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            updated_at = datetime.now().isoformat()
             with open(JLP_PRICE_CACHE_FILE, "w") as f:
                 json.dump({
                     "price": str(price),
-                    "updated_at": datetime.now().isoformat()
+                    "updated_at": updated_at
                 }, f)
+            # 写入后直接刷新备忘，后续回退读取零 I/O
+            self._jlp_cache = (price, updated_at)
+            self._jlp_cache_mtime_ns = JLP_PRICE_CACHE_FILE.stat().st_mtime_ns
             logger.debug(f"JLP 价格已缓存: ${price}")
         except Exception as e:
             logger.warning(f"保存价格缓存失败: {e}")
 
-    async def _fetch_hedge_data_with_retry(self, jlp_amount: Decimal) -> tuple[Decimal, Decimal, bool]:
+    async def _fetch_hedge_data_with_retry(self, jlp_amount: Decimal) -> tuple[Decimal, float, bool]:
         """
         获取 JLP 价格和目标对冲价值（带重试和缓存）
 
@@ -111,37 +130,37 @@ class EquityCollector:
 
         Returns:
             (price, target_hedge_value, from_cache): 价格、目标对冲价值、是否来自缓存
+            价格保留 Decimal 精度；目标对冲价值仅参与比例计算，用 float
         """
-        import httpx
-
         last_error = None
 
         for attempt in range(self.MAX_RETRIES):
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    resp = await client.get(
+                async with self._hedge_sem:
+                    resp = await self._get_http().get(
                         f"{self.hedge_api_url}/api/v1/hedge-positions",
                         params={"jlp_amount": float(jlp_amount)}
                     )
 
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if data.get("success"):
-                            hedge_data = data.get("data", {})
-                            jlp_stats = hedge_data.get("jlp_stats", {})
-                            price = Decimal(str(jlp_stats.get("virtual_price", "0")))
-
-                            # 计算目标对冲总价值
-                            hedge_positions = hedge_data.get("hedge_positions", {})
-                            target_hedge_value = Decimal("0")
-                            for pos in hedge_positions.values():
-                                target_hedge_value += Decimal(str(pos.get("value_usd", "0")))
-
-                            if price > 0:
-                                self._save_jlp_price_cache(price)
-                                return price, target_hedge_value, False
-                    else:
-                        last_error = f"HTTP {resp.status_code}"
+                if resp.status_code == 200:
+                    data = resp.json()
+                    if data.get("success"):
+                        hedge_data = data.get("data", {})
+                        jlp_stats = hedge_data.get("jlp_stats", {})
+                        price = Decimal(str(jlp_stats.get("virtual_price", "0")))
+
+                        # 计算目标对冲总价值 (比例计算用 float 即可，免逐项 Decimal 构造)
+                        hedge_positions = hedge_data.get("hedge_positions", {})
+                        target_hedge_value = sum(
+                            float(pos.get("value_usd", 0) or 0)
+                            for pos in hedge_positions.values()
+                        )
+
+                        if price > 0:
+                            self._save_jlp_price_cache(price)
+                            return price, target_hedge_value, False
+                else:
+                    last_error = f"HTTP {resp.status_code}"
 
             except Exception as e:
                 last_error = str(e)
@@ -149,18 +168,48 @@ class EquityCollector:
                     f"获取对冲数据失败 (尝试 {attempt + 1}/{self.MAX_RETRIES}): {e}"
                 )
 
-            # 重试前等待
+            # 重试前指数退避 + 抖动，避免多个采集器同步重试
             if attempt < self.MAX_RETRIES - 1:
-                await asyncio.sleep(self.RETRY_DELAY)
+                delay = self.RETRY_DELAY * (2 ** attempt) * (0.5 + random.random())
+                await asyncio.sleep(delay)
 
         # 所有重试失败，使用缓存
         cached_price, updated_at = self._load_cached_jlp_price()
         if cached_price > 0:
             logger.warning(f"使用缓存的 JLP 价格: ${cached_price} (缓存时间: {updated_at})")
-            return cached_price, Decimal("0"), True
+            return cached_price, 0.0, True
 
         logger.error(f"无法获取对冲数据: {last_error}，缓存也不可用")
-        return Decimal("0"), Decimal("0"), False
+        return Decimal("0"), 0.0, False
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """获取对冲 API 的持久化 HTTP 客户端 (惰性创建)"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=4),
+            )
+        return self._http
+
+    async def aclose(self):
+        """关闭持久化 HTTP 客户端"""
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+
+    async def _fetch_funding_rates(self) -> tuple[float, float, float]:
+        """并发获取 SOL/ETH/BTC 资金费率 (失败时整体回退 0)"""
+        try:
+            rates = await asyncio.gather(
+                self.client.get_funding_rate("SOLUSDT"),
+                self.client.get_funding_rate("ETHUSDT"),
+                self.client.get_funding_rate("BTCUSDT"),
+            )
+            sol, eth, btc = (float(r.funding_rate) for r in rates)
+            return sol, eth, btc
+        except Exception as e:
+            logger.warning(f"获取资金费率失败: {e}")
+            return 0.0, 0.0, 0.0
 
     async def collect(self) -> EquitySnapshot:
         """
@@ -171,27 +220,30 @@ class EquityCollector:
         """
         logger.info(f"[{self.account_name}] 开始采集数据...")
 
-        # 1. 获取账户信息
-        account = await self.client.get_account()
+        # 1. 账户/余额/持仓/资金费率互不依赖，并发取回
+        # (对冲数据依赖 JLP 数量，单独串在余额之后)
+        account, balances, positions, funding_rates = await asyncio.gather(
+            self.client.get_account(),
+            self.client.get_balance(),
+            self.client.get_positions(),
+            self._fetch_funding_rates(),
+        )
+        sol_funding, eth_funding, btc_funding = funding_rates
 
+        # 金额链路保留 Decimal 精度；仅参与比例计算的维持保证金用 float
         total_initial_margin = Decimal(str(account.get("totalInitialMargin", "0")))
         available_balance = Decimal(str(account.get("availableBalance", "0")))
-        total_maint_margin = Decimal(str(account.get("totalMaintMargin", "0")))
+        total_maint_margin = float(account.get("totalMaintMargin", 0) or 0)
         total_unrealized_pnl = Decimal(str(account.get("totalUnrealizedProfit", "0")))
 
-        # 2. 获取余额 (JLP)
-        balances = await self.client.get_balance()
-        jlp_amount = Decimal("0")
+        # 2. 余额/资产一次建表，按键取值
+        bal_map = {balance.asset.upper(): balance.balance for balance in balances}
+        jlp_amount = bal_map.get("JLP", Decimal("0"))
         jlp_price = Decimal("0")
         jlp_value = Decimal("0")
-        target_hedge_value = Decimal("0")
+        target_hedge_value = 0.0
         price_from_cache = False
 
-        for balance in balances:
-            if balance.asset.upper() == "JLP":
-                jlp_amount = balance.balance
-                break
-
         # 获取 JLP 价格和目标对冲价值（带重试和缓存）
         jlp_price, target_hedge_value, price_from_cache = await self._fetch_hedge_data_with_retry(jlp_amount)
         jlp_value = jlp_amount * jlp_price
@@ -203,66 +255,37 @@ class EquityCollector:
 
         # 账户净值 = JLP价值 + USDT钱包余额 + 未实现盈亏
         # 反映账户真实净值
-        usdt_wallet_balance = Decimal("0")
-        assets = account.get("assets", [])
-        for asset in assets:
-            if asset.get("asset") == "USDT":
-                usdt_wallet_balance = Decimal(str(asset.get("walletBalance", "0")))
-                break
+        asset_map = {asset.get("asset"): asset for asset in account.get("assets", [])}
+        usdt_wallet_balance = Decimal(str(asset_map.get("USDT", {}).get("walletBalance", "0")))
 
         # 账户净值 = JLP价值(USD) + USDT钱包余额 + 未实现盈亏
         equity = jlp_value + usdt_wallet_balance + total_unrealized_pnl
         logger.info(f"账户净值: JLP ${jlp_value:.2f} + USDT ${usdt_wallet_balance:.2f} + 未实现 ${total_unrealized_pnl:.2f} = ${equity:.2f}")
 
         # 保证金率 = 维持保证金 / 权益
-        margin_ratio = float(total_maint_margin / equity) if equity > 0 else 0
-
-        # 3. 获取持仓
-        positions = await self.client.get_positions()
+        margin_ratio = total_maint_margin / float(equity) if equity > 0 else 0
 
-        sol_pos = Decimal("0")
-        eth_pos = Decimal("0")
-        btc_pos = Decimal("0")
+        # 3. 一次建表，按符号取仓位
+        qty_by_symbol = {pos.symbol: pos.quantity for pos in positions}
+        sol_pos = qty_by_symbol.get("SOLUSDT", Decimal("0"))
+        eth_pos = qty_by_symbol.get("ETHUSDT", Decimal("0"))
+        btc_pos = qty_by_symbol.get("BTCUSDT", Decimal("0"))
 
-        for pos in positions:
-            if pos.symbol == "SOLUSDT":
-                sol_pos = pos.quantity
-            elif pos.symbol == "ETHUSDT":
-                eth_pos = pos.quantity
-            elif pos.symbol == "BTCUSDT":
-                btc_pos = pos.quantity
-
-        # 4. 获取资金费率
-        sol_funding = 0.0
-        eth_funding = 0.0
-        btc_funding = 0.0
-
-        try:
-            for symbol, attr in [("SOLUSDT", "sol_funding"), ("ETHUSDT", "eth_funding"), ("BTCUSDT", "btc_funding")]:
-                funding = await self.client.get_funding_rate(symbol)
-                if attr == "sol_funding":
-                    sol_funding = float(funding.funding_rate)
-                elif attr == "eth_funding":
-                    eth_funding = float(funding.funding_rate)
-                elif attr == "btc_funding":
-                    btc_funding = float(funding.funding_rate)
-        except Exception as e:
-            logger.warning(f"获取资金费率失败: {e}")
-
-        # 5. 计算对冲覆盖率 = 实际持仓价值 / 目标对冲价值
+        # 4. 计算对冲覆盖率 = 实际持仓价值 / 目标对冲价值
+        # 单遍 float 累加，免去逐项 Decimal·Decimal 乘法
         hedge_ratio = 0.0
-        total_position_value = Decimal("0")
-        for pos in positions:
-            total_position_value += abs(pos.quantity) * pos.mark_price
+        total_position_value = sum(
+            abs(float(pos.quantity)) * float(pos.mark_price) for pos in positions
+        )
 
         if target_hedge_value > 0:
             # 对冲覆盖率 = 实际对冲 / 目标对冲
-            hedge_ratio = float(total_position_value / target_hedge_value)
+            hedge_ratio = total_position_value / target_hedge_value
             logger.info(f"对冲覆盖率: 实际 ${total_position_value:.2f} / 目标 ${target_hedge_value:.2f} = {hedge_ratio:.2%}")
         elif jlp_value > 0:
             # 降级：如果没有目标值，用 JLP 价值计算
-            hedge_ratio = float(total_position_value / jlp_value)
-            logger.info(f"对冲比例(降级): ${total_position_value:.2f} / ${jlp_value:.2f} = {hedge_ratio:.2%}")
+            hedge_ratio = total_position_value / float(jlp_value)
+            logger.info(f"对冲比例(降级): ${total_position_value:.2f} / ${float(jlp_value):.2f} = {hedge_ratio:.2%}")
 
         snapshot = EquitySnapshot(
             timestamp=datetime.now(),
@@ -4,6 +4,8 @@
 发送报告消息和图表到企业微信群
 """
 
+import hashlib
+import asyncio
 import logging
 import httpx
 from typing import Optional
@@ -11,8 +13,71 @@ from dataclasses import dataclass
 
 from scripts.equity_reporter.calculator import ReportMetrics
 
+try:
+    import pybase64 as base64  # SIMD (AVX2/SSSE3) 加速，接口与标准库一致
+except ImportError:  # 可选依赖，缺失时回退标准库
+    import base64
+
 logger = logging.getLogger(__name__)
 
+# 盈亏/百分比着色模板: 按符号 (-1/0/+1) 索引，免去每次报告重建闭包和多级分支
+_PNL_TAGS = (
+    '<font color="warning">${v:,.2f}</font>',  # 负
+    '${v:,.2f}',                               # 零
+    '<font color="info">+${v:,.2f}</font>',    # 正
+)
+_PCT_TAGS = (
+    '<font color="warning">{v:.2%}</font>',
+    '{v:.2%}',
+    '<font color="info">+{v:.2%}</font>',
+)
+
+
+def _prepare_image(image_bytes: bytes) -> tuple[str, str]:
+    """单次遍历计算图片的 base64 与 MD5 (供线程池调用)
+
+    usedforsecurity=False 跳过 FIPS 检查; base64 输出纯 ASCII，
+    ascii 解码器比 utf-8 少一次多字节探测
+    """
+    md5_hash = hashlib.new("md5", image_bytes, usedforsecurity=False).hexdigest()
+    b64_data = base64.b64encode(image_bytes).decode('ascii')
+    return b64_data, md5_hash
+
+
+# 报告主体模板: 模块级常量 + format_map，插值一次完成，
+# 免去每次调用重跑 f-string 的 FORMAT_VALUE/BUILD_STRING 字节码
+_REPORT_TEMPLATE = """{title}
+
+💰 **账户净值**: <font color="info">${current_equity:,.2f}</font>
+
+📈 **收益统计**
+今日: {today_pnl} ({today_pct})
+本周: {week_pnl} ({week_pct})
+本月: {month_pnl} ({month_pct})
+
+📊 **持仓信息**
+SOL: {sol_pos:,.4f} | 费率 {sol_funding:.4%}
+ETH: {eth_pos:,.4f} | 费率 {eth_funding:.4%}
+BTC: {btc_pos:,.6f} | 费率 {btc_funding:.4%}
+
+📋 **账户详情**
+JLP: {jlp_amount:,.2f} × ${jlp_price:.4f} = ${jlp_value:,.2f}
+可用余额: ${available_balance:,.2f}
+未实现盈亏: {unrealized_pnl}
+保证金率: {margin_ratio:.2%}
+对冲比例: {hedge_ratio:.2%}
+"""
+
+
+def _pnl_color(pnl: float) -> str:
+    """金额着色: 正绿负红零原色"""
+    return _PNL_TAGS[(pnl > 0) - (pnl < 0) + 1].format(v=pnl)
+
+
+def _pct_color(pct: float) -> str:
+    """百分比着色: 正绿负红零原色"""
+    return _PCT_TAGS[(pct > 0) - (pct < 0) + 1].format(v=pct)
+
 
 @dataclass
 class WeChatConfig:
@@ -33,6 +98,35 @@ class WeChatNotifier:
             config: 企业微信配置
         """
         self.config = config
+        # 持久化 HTTP 客户端: keep-alive 复用连接，省掉每条消息的 TCP/TLS 握手
+        self._http: Optional[httpx.AsyncClient] = None
+        # 在途的后台图表推送任务 (持有强引用防 GC，完成后自动移除)
+        self._bg_tasks: set = set()
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """获取持久化 HTTP 客户端 (惰性创建，保证在事件循环内实例化)"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=self.config.timeout,
+                limits=httpx.Limits(
+                    max_keepalive_connections=5,
+                    max_connections=10,
+                    keepalive_expiry=30,
+                ),
+            )
+        return self._http
+
+    async def drain(self):
+        """等待所有在途的后台图表推送完成"""
+        if self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+
+    async def aclose(self):
+        """排空后台推送并关闭持久化 HTTP 客户端"""
+        await self.drain()
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
 
     async def send_text(self, content: str) -> bool:
         """
@@ -116,23 +210,22 @@ class WeChatNotifier:
             bool: 是否成功
         """
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                resp = await client.post(
-                    self.config.webhook_url,
-                    json=payload,
-                )
-
-                if resp.status_code == 200:
-                    result = resp.json()
-                    if result.get("errcode") == 0:
-                        logger.info("消息发送成功")
-                        return True
-                    else:
-                        logger.error(f"发送失败: {result}")
-                        return False
+            resp = await self._get_http().post(
+                self.config.webhook_url,
+                json=payload,
+            )
+
+            if resp.status_code == 200:
+                result = resp.json()
+                if result.get("errcode") == 0:
+                    logger.info("消息发送成功")
+                    return True
                 else:
-                    logger.error(f"HTTP 错误: {resp.status_code}")
+                    logger.error(f"发送失败: {result}")
                     return False
+            else:
+                logger.error(f"HTTP 错误: {resp.status_code}")
+                return False
 
         except Exception as e:
             logger.error(f"发送消息异常: {e}")
@@ -149,56 +242,31 @@ class WeChatNotifier:
         Returns:
             str: Markdown 格式的报告
         """
-        # 盈亏颜色标记
-        def pnl_color(pnl: float) -> str:
-            if pnl > 0:
-                return f"<font color=\"info\">+${pnl:,.2f}</font>"
-            elif pnl < 0:
-                return f"<font color=\"warning\">${pnl:,.2f}</font>"
-            else:
-                return f"${pnl:,.2f}"
-
-        def pct_color(pct: float) -> str:
-            if pct > 0:
-                return f"<font color=\"info\">+{pct:.2%}</font>"
-            elif pct < 0:
-                return f"<font color=\"warning\">{pct:.2%}</font>"
-            else:
-                return f"{pct:.2%}"
-
-        # 未实现盈亏颜色
-        def unrealized_color(pnl: float) -> str:
-            if pnl > 0:
-                return f"<font color=\"info\">+${pnl:,.2f}</font>"
-            elif pnl < 0:
-                return f"<font color=\"warning\">${pnl:,.2f}</font>"
-            else:
-                return f"${pnl:,.2f}"
-
-        # 构建报告 (企业微信手机端兼容格式)
+        # 构建报告 (企业微信手机端兼容格式，插值走模块级模板)
         title = f"📊 **JLP 中性套利报告 - {account_name}**" if account_name else "📊 **JLP 中性套利报告**"
-        report = f"""{title}
-
-💰 **账户净值**: <font color="info">${metrics.current_equity:,.2f}</font>
-
-📈 **收益统计**
-今日: {pnl_color(metrics.today_pnl.pnl)} ({pct_color(metrics.today_pnl.pnl_pct)})
-本周: {pnl_color(metrics.week_pnl.pnl)} ({pct_color(metrics.week_pnl.pnl_pct)})
-本月: {pnl_color(metrics.month_pnl.pnl)} ({pct_color(metrics.month_pnl.pnl_pct)})
-
-📊 **持仓信息**
-SOL: {metrics.sol_pos:,.4f} | 费率 {metrics.sol_funding:.4%}
-ETH: {metrics.eth_pos:,.4f} | 费率 {metrics.eth_funding:.4%}
-BTC: {metrics.btc_pos:,.6f} | 费率 {metrics.btc_funding:.4%}
-
-📋 **账户详情**
-JLP: {metrics.jlp_amount:,.2f} × ${metrics.jlp_price:.4f} = ${metrics.jlp_value:,.2f}
-可用余额: ${metrics.available_balance:,.2f}
-未实现盈亏: {unrealized_color(metrics.unrealized_pnl)}
-保证金率: {metrics.margin_ratio:.2%}
-对冲比例: {metrics.hedge_ratio:.2%}
-"""
-        return report
+        return _REPORT_TEMPLATE.format_map({
+            "title": title,
+            "current_equity": metrics.current_equity,
+            "today_pnl": _pnl_color(metrics.today_pnl.pnl),
+            "today_pct": _pct_color(metrics.today_pnl.pnl_pct),
+            "week_pnl": _pnl_color(metrics.week_pnl.pnl),
+            "week_pct": _pct_color(metrics.week_pnl.pnl_pct),
+            "month_pnl": _pnl_color(metrics.month_pnl.pnl),
+            "month_pct": _pct_color(metrics.month_pnl.pnl_pct),
+            "sol_pos": metrics.sol_pos,
+            "sol_funding": metrics.sol_funding,
+            "eth_pos": metrics.eth_pos,
+            "eth_funding": metrics.eth_funding,
+            "btc_pos": metrics.btc_pos,
+            "btc_funding": metrics.btc_funding,
+            "jlp_amount": metrics.jlp_amount,
+            "jlp_price": metrics.jlp_price,
+            "jlp_value": metrics.jlp_value,
+            "available_balance": metrics.available_balance,
+            "unrealized_pnl": _pnl_color(metrics.unrealized_pnl),
+            "margin_ratio": metrics.margin_ratio,
+            "hedge_ratio": metrics.hedge_ratio,
+        })
 
     async def send_report(
         self,
@@ -217,9 +285,6 @@ JLP: {metrics.jlp_amount:,.2f} × ${metrics.jlp_price:.4f} = ${metrics.jlp_value
         Returns:
             bool: 是否成功
         """
-        import hashlib
-        import base64
-
         # 1. 发送 Markdown 报告
         report_md = self.format_report(metrics, account_name)
         success = await self.send_markdown(report_md)
@@ -228,18 +293,32 @@ JLP: {metrics.jlp_amount:,.2f} × ${metrics.jlp_price:.4f} = ${metrics.jlp_value
             logger.error("发送报告文本失败")
             return False
 
-        # 2. 发送图表
+        # 2. 图表转后台任务推送: markdown 确认送达即返回，
+        #    图片的 HTTP 往返不再占用报告主链路
         if chart_images:
-            for i, image_bytes in enumerate(chart_images):
-                try:
-                    # 计算 MD5 和 Base64
-                    md5_hash = hashlib.md5(image_bytes).hexdigest()
-                    b64_data = base64.b64encode(image_bytes).decode('utf-8')
-
-                    img_success = await self.send_image(b64_data, md5_hash)
-                    if not img_success:
-                        logger.error(f"发送图表 {i+1} 失败")
-                except Exception as e:
-                    logger.error(f"处理图表 {i+1} 异常: {e}")
+            task = asyncio.create_task(self._send_charts(list(chart_images)))
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
 
         return True
+
+    async def _send_charts(self, chart_images: list) -> None:
+        """后台编码并推送图表 (编码下放线程池)"""
+        encoded = await asyncio.gather(
+            *(asyncio.to_thread(_prepare_image, img) for img in chart_images),
+            return_exceptions=True,
+        )
+        prepared = []
+        for i, item in enumerate(encoded):
+            if isinstance(item, BaseException):
+                logger.error(f"处理图表 {i+1} 异常: {item}")
+            else:
+                prepared.append((i, item[0], item[1]))
+
+        results = await asyncio.gather(
+            *(self.send_image(b64, md5) for _, b64, md5 in prepared),
+            return_exceptions=True,
+        )
+        for (i, _, _), img_success in zip(prepared, results):
+            if isinstance(img_success, BaseException) or not img_success:
+                logger.error(f"发送图表 {i+1} 失败")
@@ -25,7 +25,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from clients.asterdex_client import AsterDexClient
 from scripts.equity_reporter.collector import EquityCollector
 from scripts.equity_reporter.storage import EquityStorage
-from scripts.equity_reporter.calculator import EquityCalculator
+from scripts.equity_reporter.calculator import EquityCalculator, CurrentSnapshot
 from scripts.equity_reporter.chart_generator import ChartGenerator
 from scripts.equity_reporter.notifier import WeChatNotifier, WeChatConfig
 
@@ -37,6 +37,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger("equity_reporter")
 
+# 汇总报告模板: 模块级常量 + format_map，免去每次推送重跑 f-string 插值
+_SUMMARY_HEADER = """📊 **JLP 中性套利 - 多账户汇总**
+
+💰 **总净值**: <font color="info">${total_equity:,.2f}</font>
+
+📈 **汇总收益**
+今日: {today_sign}${total_today_pnl:,.2f} ({today_pct:+.2f}%)
+本周: {week_sign}${total_week_pnl:,.2f} ({week_pct:+.2f}%)
+本月: {month_sign}${total_month_pnl:,.2f} ({month_pct:+.2f}%)
+
+📋 **账户明细**"""
+
+_SUMMARY_FOOTER = """
+📊 **汇总详情**
+JLP 总价值: ${total_jlp_value:,.2f}
+未实现盈亏: ${total_unrealized:,.2f}
+账户数量: {account_count}
+"""
+
 
 class EquityReporter:
     """净值报告服务 - 支持多用户"""
@@ -81,8 +100,12 @@ class EquityReporter:
             logger.error(f"配置文件不存在: {self.config_path}")
             sys.exit(1)
 
-        with open(self.config_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        raw = self.config_path.read_bytes()
+        try:
+            import orjson
+            return orjson.loads(raw)
+        except ImportError:
+            return json.loads(raw)
 
     async def _init_clients(self):
         """初始化所有启用账户的 AsterDex 客户端"""
@@ -134,15 +157,21 @@ class EquityReporter:
             if not self.collectors:
                 await self._init_clients()
 
+            # 各账户 HTTP 采集在事件循环上并发，总耗时取决于最慢账户而非账户数
+            items = list(self.collectors.items())
+            results = await asyncio.gather(
+                *(collector.collect() for _, (_, collector) in items),
+                return_exceptions=True,
+            )
+
             success_count = 0
-            for account_name, (client, collector) in self.collectors.items():
-                try:
-                    snapshot = await collector.collect()
-                    self.storage.append_snapshot(snapshot)
-                    logger.info(f"[{account_name}] 数据采集成功: equity=${snapshot.equity:.2f}")
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"[{account_name}] 数据采集失败: {e}")
+            for (account_name, _), result in zip(items, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"[{account_name}] 数据采集失败: {result}")
+                    continue
+                self.storage.append_snapshot(result)
+                logger.info(f"[{account_name}] 数据采集成功: equity=${result.equity:.2f}")
+                success_count += 1
 
             return success_count > 0
 
@@ -167,10 +196,19 @@ class EquityReporter:
             all_snapshots = []
             all_metrics = []
 
-            # 1. 采集所有账户数据
-            for account_name, (client, collector) in self.collectors.items():
+            # 1. 并发采集所有账户数据
+            items = list(self.collectors.items())
+            results = await asyncio.gather(
+                *(collector.collect() for _, (_, collector) in items),
+                return_exceptions=True,
+            )
+
+            for (account_name, _), result in zip(items, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"[{account_name}] 采集失败: {result}")
+                    continue
                 try:
-                    snapshot = await collector.collect()
+                    snapshot = result
                     self.storage.append_snapshot(snapshot)
                     all_snapshots.append(snapshot)
 
@@ -178,59 +216,63 @@ class EquityReporter:
                     df = self.storage.get_history(days=365, account=account_name)
 
                     # 计算该账户的指标
-                    current_snapshot = {
-                        "equity": float(snapshot.equity),
-                        "jlp_amount": float(snapshot.jlp_amount),
-                        "jlp_price": float(snapshot.jlp_price),
-                        "jlp_value": float(snapshot.jlp_value),
-                        "available_balance": float(snapshot.available_balance),
-                        "unrealized_pnl": float(snapshot.unrealized_pnl),
-                        "margin_ratio": snapshot.margin_ratio,
-                        "hedge_ratio": snapshot.hedge_ratio,
-                        "sol_pos": float(snapshot.sol_pos),
-                        "eth_pos": float(snapshot.eth_pos),
-                        "btc_pos": float(snapshot.btc_pos),
-                        "sol_funding": snapshot.sol_funding,
-                        "eth_funding": snapshot.eth_funding,
-                        "btc_funding": snapshot.btc_funding,
-                    }
+                    current_snapshot = CurrentSnapshot(
+                        equity=float(snapshot.equity),
+                        jlp_amount=float(snapshot.jlp_amount),
+                        jlp_price=float(snapshot.jlp_price),
+                        jlp_value=float(snapshot.jlp_value),
+                        available_balance=float(snapshot.available_balance),
+                        unrealized_pnl=float(snapshot.unrealized_pnl),
+                        margin_ratio=snapshot.margin_ratio,
+                        hedge_ratio=snapshot.hedge_ratio,
+                        sol_pos=float(snapshot.sol_pos),
+                        eth_pos=float(snapshot.eth_pos),
+                        btc_pos=float(snapshot.btc_pos),
+                        sol_funding=snapshot.sol_funding,
+                        eth_funding=snapshot.eth_funding,
+                        btc_funding=snapshot.btc_funding,
+                    )
 
                     metrics = self.calculator.calc_report_metrics(df, current_snapshot)
                     all_metrics.append((account_name, metrics, df))
 
                 except Exception as e:
-                    logger.error(f"[{account_name}] 采集失败: {e}")
+                    logger.error(f"[{account_name}] 指标计算失败: {e}")
 
             if not all_metrics:
                 logger.error("没有成功采集任何账户数据")
                 return False
 
-            # 2. 发送每个账户的报告
+            # 2. 生成图表后并发推送各账户报告
+            prepared = []
             for account_name, metrics, df in all_metrics:
-                try:
-                    # 生成图表
-                    chart_images = []
-                    if with_charts and not df.empty:
-                        try:
-                            chart_images = [
-                                self.chart_generator.generate_7d_chart(df, account_name),
-                                self.chart_generator.generate_30d_chart(df, account_name),
-                                self.chart_generator.generate_365d_chart(df, account_name),
-                            ]
-                            logger.info(f"[{account_name}] 生成了 {len(chart_images)} 张图表")
-                        except Exception as e:
-                            logger.error(f"[{account_name}] 生成图表失败: {e}")
-
-                    # 发送报告（包含账户名）
-                    success = await self.notifier.send_report(metrics, chart_images, account_name)
-
-                    if success:
-                        logger.info(f"[{account_name}] 报告发送成功")
-                    else:
-                        logger.error(f"[{account_name}] 报告发送失败")
-
-                except Exception as e:
-                    logger.error(f"[{account_name}] 发送报告失败: {e}")
+                chart_images = []
+                if with_charts and not df.empty:
+                    try:
+                        chart_images = [
+                            self.chart_generator.generate_7d_chart(df, account_name),
+                            self.chart_generator.generate_30d_chart(df, account_name),
+                            self.chart_generator.generate_365d_chart(df, account_name),
+                        ]
+                        logger.info(f"[{account_name}] 生成了 {len(chart_images)} 张图表")
+                    except Exception as e:
+                        logger.error(f"[{account_name}] 生成图表失败: {e}")
+                prepared.append((account_name, metrics, chart_images))
+
+            send_results = await asyncio.gather(
+                *(
+                    self.notifier.send_report(metrics, chart_images, account_name)
+                    for account_name, metrics, chart_images in prepared
+                ),
+                return_exceptions=True,
+            )
+            for (account_name, _, _), result in zip(prepared, send_results):
+                if isinstance(result, BaseException):
+                    logger.error(f"[{account_name}] 发送报告失败: {result}")
+                elif result:
+                    logger.info(f"[{account_name}] 报告发送成功")
+                else:
+                    logger.error(f"[{account_name}] 报告发送失败")
 
             # 3. 如果有多个账户，发送汇总报告
             if len(all_metrics) > 1:
@@ -263,30 +305,32 @@ class EquityReporter:
             week_pct = total_week_pnl / total_equity * 100 if total_equity > 0 else 0
             month_pct = total_month_pnl / total_equity * 100 if total_equity > 0 else 0
 
-            # 构建汇总报告
-            summary = f"""📊 **JLP 中性套利 - 多账户汇总**
-
-💰 **总净值**: <font color="info">${total_equity:,.2f}</font>
-
-📈 **汇总收益**
-今日: {"+" if total_today_pnl >= 0 else ""}${total_today_pnl:,.2f} ({today_pct:+.2f}%)
-本周: {"+" if total_week_pnl >= 0 else ""}${total_week_pnl:,.2f} ({week_pct:+.2f}%)
-本月: {"+" if total_month_pnl >= 0 else ""}${total_month_pnl:,.2f} ({month_pct:+.2f}%)
-
-📋 **账户明细**"""
+            # 构建汇总报告 (list + join，避免循环内 str += 的二次方拷贝)
+            lines = [_SUMMARY_HEADER.format_map({
+                "total_equity": total_equity,
+                "today_sign": "+" if total_today_pnl >= 0 else "",
+                "total_today_pnl": total_today_pnl,
+                "today_pct": today_pct,
+                "week_sign": "+" if total_week_pnl >= 0 else "",
+                "total_week_pnl": total_week_pnl,
+                "week_pct": week_pct,
+                "month_sign": "+" if total_month_pnl >= 0 else "",
+                "total_month_pnl": total_month_pnl,
+                "month_pct": month_pct,
+            })]
 
             for account_name, metrics, _ in all_metrics:
                 pnl_icon = "🟢" if metrics.today_pnl.pnl >= 0 else "🔴"
-                summary += f"""
-{pnl_icon} **{account_name}**: ${metrics.current_equity:,.2f} (今日 {metrics.today_pnl.pnl:+.2f})"""
-
-            summary += f"""
+                lines.append(
+                    f"{pnl_icon} **{account_name}**: ${metrics.current_equity:,.2f} (今日 {metrics.today_pnl.pnl:+.2f})"
+                )
 
-📊 **汇总详情**
-JLP 总价值: ${total_jlp_value:,.2f}
-未实现盈亏: ${total_unrealized:,.2f}
-账户数量: {len(all_metrics)}
-"""
+            lines.append(_SUMMARY_FOOTER.format_map({
+                "total_jlp_value": total_jlp_value,
+                "total_unrealized": total_unrealized,
+                "account_count": len(all_metrics),
+            }))
+            summary = "\n".join(lines)
 
             await self.notifier.send_markdown(summary)
             logger.info("多账户汇总报告发送成功")
@@ -296,6 +340,16 @@ JLP 总价值: ${total_jlp_value:,.2f}
             logger.error(f"发送汇总报告失败: {e}")
             return False
 
+    async def close(self):
+        """关闭推送器与各账户采集器的持久化 HTTP 连接"""
+        await self.notifier.aclose()
+        for client, collector in self.collectors.values():
+            try:
+                await collector.aclose()
+                await client.close()
+            except Exception as e:
+                logger.error(f"关闭采集器连接失败: {e}")
+
     async def run_daemon(self):
         """
         后台运行模式
@@ -310,42 +364,56 @@ JLP 总价值: ${total_jlp_value:,.2f}
         await self._init_clients()
         logger.info(f"监控账户: {list(self.collectors.keys())}")
 
-        last_report_time = None  # 上次发送报告的时间
+        # 采集节拍对齐单调时钟，推送/采集耗时不会累积成漂移
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        collect_interval_s = self.collect_interval * 60
+        report_interval_s = self.report_interval * 60
+        next_report_target = t0  # 首次运行立即发送一次报告
+        report_task = None  # 持有引用，防止后台任务被 GC
         collect_count = 0  # 采集计数
+        tick = 0
 
-        while True:
-            try:
-                now = datetime.now()
-
-                # 1. 采集所有账户数据
-                await self.collect_once()
-                collect_count += 1
-
-                # 2. 检查是否到报告时间（每 report_interval 分钟发送一次）
-                should_report = False
-                if last_report_time is None:
-                    # 首次运行，立即发送一次报告
-                    should_report = True
-                else:
-                    elapsed = (now - last_report_time).total_seconds() / 60
-                    if elapsed >= self.report_interval:
-                        should_report = True
-
-                if should_report:
-                    logger.info(f"发送定时报告 (已采集 {collect_count} 次, {len(self.collectors)} 个账户)")
-                    await self.send_report(with_charts=True)
-                    last_report_time = now
-
-                # 3. 更新每日汇总（每天 0 点）
-                if now.hour == 0 and now.minute < self.collect_interval:
-                    self.storage.update_daily_summary()
-
-                # 等待下次采集
-                await asyncio.sleep(self.collect_interval * 60)
+        try:
+            while True:
+                try:
+                    now = datetime.now()
+
+                    # 1. 采集所有账户数据
+                    await self.collect_once()
+                    collect_count += 1
+
+                    # 2. 报告独立计时并放入后台任务，慢推送不挤占采集节拍
+                    #    (上一份报告未发完时跳过本次触发，避免重叠)
+                    if loop.time() >= next_report_target and (
+                        report_task is None or report_task.done()
+                    ):
+                        logger.info(f"发送定时报告 (已采集 {collect_count} 次, {len(self.collectors)} 个账户)")
+                        report_task = asyncio.create_task(self.send_report(with_charts=True))
+                        next_report_target += report_interval_s
+                        while next_report_target <= loop.time():
+                            next_report_target += report_interval_s
+
+                    # 3. 更新每日汇总（每天 0 点）
+                    if now.hour == 0 and now.minute < self.collect_interval:
+                        self.storage.update_daily_summary()
+
+                    # 睡到下一个对齐节拍，采集超时则跳过错过的节拍
+                    tick += 1
+                    target = t0 + tick * collect_interval_s
+                    now_t = loop.time()
+                    if target <= now_t:
+                        tick = int((now_t - t0) // collect_interval_s) + 1
+                        target = t0 + tick * collect_interval_s
+                    await asyncio.sleep(target - now_t)
 
-            except Exception as e:
-                logger.error(f"运行异常: {e}")
-                await asyncio.sleep(60)  # 出错后等待 1 分钟重试
+                except Exception as e:
+                    logger.error(f"运行异常: {e}")
+                    await asyncio.sleep(60)  # 出错后等待 1 分钟重试
+        finally:
+            if report_task is not None and not report_task.done():
+                report_task.cancel()
+            await self.close()
 
 
 def main():
@@ -391,21 +459,28 @@ def main():
     config_path = Path(args.config)
     reporter = EquityReporter(config_path)
 
+    async def run_once(coro):
+        """单次模式: 执行完毕后关闭持久化连接"""
+        try:
+            return await coro
+        finally:
+            await reporter.close()
+
     if args.daemon:
-        # 后台模式
+        # 后台模式（run_daemon 退出时自行关闭连接）
         asyncio.run(reporter.run_daemon())
 
     elif args.report_now:
         # 立即发送报告
-        asyncio.run(reporter.send_report(with_charts=not args.no_charts))
+        asyncio.run(run_once(reporter.send_report(with_charts=not args.no_charts)))
 
     elif args.collect_only:
         # 仅采集
-        asyncio.run(reporter.collect_once())
+        asyncio.run(run_once(reporter.collect_once()))
 
     else:
         # 默认：采集一次 + 发送报告
-        asyncio.run(reporter.send_report(with_charts=not args.no_charts))
+        asyncio.run(run_once(reporter.send_report(with_charts=not args.no_charts)))
 
 
 if __name__ == "__main__":